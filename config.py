@@ -36,6 +36,10 @@ class Config:
         'embedding_model': 'BAAI/bge-small-en-v1.5',
         'device': 'cpu',  # 'cpu' or 'cuda'
         'batch_size': 50,
+        'compile_embeddings': False,  # torch.compile the model (slow first start)
+        'quantize_embeddings': False,  # int8 on CPU, float16 on CUDA
+        'index_workers': 4,  # Processes loading/chunking files during indexing
+        'warmup_embeddings': True,  # Load the model at startup, not on first search
         
         # Search settings
         'semantic_weight': 0.7,
@@ -50,6 +54,8 @@ class Config:
         'n_ctx': 4096,
         'n_threads': 4,
         'n_gpu_layers': 0,
+        'kv_cache_mb': 2048,
+        'use_cuda_graphs': True,
         
         # API LLM settings
         'api_provider': 'openai',  # 'openai', 'anthropic'
@@ -61,11 +67,18 @@ class Config:
         'temperature': 0.7,
         'max_tokens': 1000,
         'top_p': 0.9,
+        'n_parallel': 4,
         'max_context_chunks': 5,
         
+        # Answer cache settings
+        'semantic_cache_size': 128,
+        'semantic_cache_threshold': 0.95,
+        
         # File watcher settings
         'enable_file_watcher': True,
         'debounce_seconds': 2.0,
+        'watch_force_polling': False,  # Poll even on local disks
+        'watch_polling_interval': 3.0,  # Seconds, for network shares
         
         # Database settings
         'db_path': './chroma_db',
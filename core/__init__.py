@@ -5,12 +5,7 @@ This module contains the fundamental components for document processing,
 embedding generation, and vector storage.
 """
 
-from .embeddings import EmbeddingGenerator
-from .vector_store import VectorStore
-from .file_loader import FileLoader
-from .chunker import TextChunker
-from .indexer import DocumentIndexer
-from .search_engine import SearchEngine
+import importlib
 
 __all__ = [
     'EmbeddingGenerator',
@@ -18,7 +13,33 @@ __all__ = [
     'FileLoader',
     'TextChunker',
     'DocumentIndexer',
+    'IndexQueue',
+    'IndexJournal',
     'SearchEngine',
 ]
 
-__version__ = '0.1.0'
\ No newline at end of file
+__version__ = '0.1.0'
+
+# Submodule defining each exported name. Submodules are imported on first
+# access, so indexing worker processes (which only unpickle the file loader
+# and chunker) do not import sentence_transformers or chromadb.
+_SUBMODULES = {
+    'EmbeddingGenerator': '.embeddings',
+    'VectorStore': '.vector_store',
+    'FileLoader': '.file_loader',
+    'TextChunker': '.chunker',
+    'DocumentIndexer': '.indexer',
+    'IndexQueue': '.indexer',
+    'IndexJournal': '.index_journal',
+    'SearchEngine': '.search_engine',
+}
+
+
+def __getattr__(name: str):
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(submodule, __name__), name)
+    globals()[name] = value
+    return value
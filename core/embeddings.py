@@ -3,7 +3,9 @@ Embedding generation using sentence-transformers.
 """
 
 import logging
-from typing import List, Union
+import os
+import threading
+from typing import List, Optional, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
@@ -31,6 +33,9 @@ class EmbeddingGenerator:
         self.model_name = model_name
         self.device = device
         self._model = None
+        self._model_lock = threading.Lock()  # Model may be loaded from a warm-up thread
+        self._quantize = False  # Set by quantize()
+        self._compile = False  # Set by compile()
         self.embedding_dim = 384  # BGE-small dimension
         
         logger.info(f"Initializing EmbeddingGenerator with model: {model_name}")
@@ -39,11 +44,95 @@ class EmbeddingGenerator:
     def model(self) -> SentenceTransformer:
         """Lazy load the model on first use."""
         if self._model is None:
-            logger.info(f"Loading model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name, device=self.device)
-            logger.info("Model loaded successfully")
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"Loading model: {self.model_name}")
+                    model = SentenceTransformer(self.model_name, device=self.device)
+                    logger.info("Model loaded successfully")
+                    
+                    self._model = model
+                    if self._quantize:
+                        self._quantize_model()
+                    if self._compile:
+                        self._compile_model()
         return self._model
     
+    def quantize(self) -> None:
+        """
+        Run the model at reduced precision.
+        
+        On CPU the linear layers are dynamically quantized to int8; on CUDA
+        the weights are cast to float16. Either roughly halves the memory
+        traffic per forward pass, with negligible effect on retrieval.
+        """
+        self._quantize = True
+        
+        if self._model is not None:
+            self._quantize_model()
+    
+    def _quantize_model(self) -> None:
+        """Quantize the loaded model for its device."""
+        import torch
+        
+        try:
+            if self.device == "cuda":
+                self._model.half()
+                logger.info("Embedding model converted to float16")
+            else:
+                torch.ao.quantization.quantize_dynamic(
+                    self._model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
+                logger.info("Embedding model quantized to int8")
+        except Exception as e:
+            logger.warning(f"Could not quantize embedding model: {e}")
+            self._quantize = False
+    
+    def compile(self, cache_dir: Optional[str] = None) -> bool:
+        """
+        Compile the transformer with torch.compile.
+        
+        Compiled kernels are written to cache_dir (TorchInductor's on-disk
+        cache, keyed by graph, device and torch version), so only the first
+        run pays the full compilation cost. Compilation itself happens on
+        the first forward pass.
+        
+        Args:
+            cache_dir: Directory for compiled artifacts (optional)
+            
+        Returns:
+            True if compilation was enabled, False if unsupported
+        """
+        import torch
+        
+        if not hasattr(torch, 'compile'):
+            logger.warning("torch.compile not available (requires PyTorch 2.0+)")
+            return False
+        
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', cache_dir)
+            os.environ.setdefault('TORCHINDUCTOR_FX_GRAPH_CACHE', '1')
+        
+        self._compile = True
+        
+        if self._model is not None:
+            self._compile_model()
+        
+        return True
+    
+    def _compile_model(self) -> None:
+        """Wrap the loaded transformer in torch.compile."""
+        import torch
+        
+        try:
+            transformer = self._model[0]
+            # Batch size and sequence length vary per call
+            transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+            logger.info("Embedding model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"Could not compile embedding model: {e}")
+            self._compile = False
+    
     def generate(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
         """
         Generate embeddings for text(s).
@@ -78,6 +167,23 @@ class EmbeddingGenerator:
             logger.error(f"Error generating embeddings: {e}")
             raise
     
+    def warmup(self, batch_size: int = 8) -> None:
+        """
+        Load the model and run a dummy batch.
+        
+        The first forward pass pays for weight loading, compilation and (on
+        CUDA) kernel selection; doing it ahead of time keeps that out of the
+        first search.
+        
+        Args:
+            batch_size: Size of the dummy batch
+        """
+        try:
+            self.generate(["warmup query"] * batch_size, batch_size=batch_size)
+            logger.info("Embedding model warmed up")
+        except Exception as e:
+            logger.warning(f"Embedding model warm-up failed: {e}")
+    
     def generate_query_embedding(self, query: str) -> np.ndarray:
         """
         Generate embedding for a search query.
@@ -3,7 +3,8 @@ Document loading for various file formats.
 """
 
 import logging
-from typing import Optional, Dict, Any
+import os
+from typing import Optional, Dict, Any, Iterator
 from pathlib import Path
 import mimetypes
 
@@ -231,6 +232,39 @@ class FileLoader:
         supported = {'.txt', '.md', '.pdf', '.docx', '.png', '.jpg', '.jpeg'}
         return ext in supported
     
+    @staticmethod
+    def iter_supported(folder_path: str, recursive: bool = True) -> Iterator[Path]:
+        """
+        Yield supported files under a folder as they are found.
+        
+        Uses os.scandir, whose entries carry the file type from the directory
+        listing, so no extra stat call is made per entry. Symlinked
+        directories are not followed.
+        
+        Args:
+            folder_path: Folder to search
+            recursive: Whether to descend into subdirectories
+            
+        Yields:
+            Paths of supported files
+        """
+        pending = [folder_path]
+        
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    pending.append(entry.path)
+                            elif entry.is_file() and FileLoader.is_supported(entry.name):
+                                yield Path(entry.path)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warning(f"Cannot read directory: {e}")
+    
     @staticmethod
     def get_supported_extensions() -> list:
         """Get list of supported file extensions."""
@@ -0,0 +1,238 @@
+"""
+Persistent record of indexed file fingerprints.
+"""
+
+import hashlib
+import logging
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (mtime_ns, size, head_hash), as computed by the application's file watcher
+Fingerprint = Tuple[int, int, int]
+
+
+class IndexJournal:
+    """
+    Memory-mapped hash table of file fingerprints at the time of indexing.
+    
+    Survives restarts, so file events for files that were already indexed
+    with the same content can be skipped without loading anything. Lookups
+    and updates touch a single slot of the mapping; the OS writes dirty
+    pages back to disk.
+    
+    Layout: a 16-byte header followed by a power-of-two number of 32-byte
+    slots (path key, mtime_ns, size, head_hash), using linear probing.
+    """
+    
+    MAGIC = b'LSEJ'
+    VERSION = 1
+    
+    _HEADER = struct.Struct('<4sIII')  # magic, version, capacity, used slots
+    _SLOT = struct.Struct('<QqqQ')  # key, mtime_ns, size, head_hash
+    
+    # Size of a discarded entry (the key stays so probe chains remain intact)
+    _REMOVED = -1
+    
+    # Grow when this share of slots is used
+    MAX_LOAD = 0.7
+    
+    def __init__(self, path: str, capacity: int = 65536):
+        """
+        Open or create a journal.
+        
+        Args:
+            path: Journal file path
+            capacity: Initial number of slots (rounded up to a power of two)
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._capacity = 0
+        self._used = 0
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            self._open()
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Index journal unreadable, starting a new one: {e}")
+            self._close_map()
+            self.path.unlink(missing_ok=True)
+        
+        if self._map is None:
+            self._create(max(1, capacity - 1).bit_length())
+        
+        logger.info(f"Index journal opened: {self.path} ({self._used} entries)")
+    
+    def _open(self) -> None:
+        """Map an existing journal file."""
+        if not self.path.exists():
+            return
+        
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        
+        magic, version, capacity, used = self._HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("not an index journal")
+        if len(self._map) != self._HEADER.size + capacity * self._SLOT.size:
+            raise ValueError("truncated journal")
+        
+        self._capacity = capacity
+        self._used = used
+    
+    def _create(self, bits: int) -> None:
+        """Create an empty journal file with 2**bits slots."""
+        self._close_map()
+        
+        self._capacity = 1 << bits
+        self._used = 0
+        
+        self._file = open(self.path, 'w+b')
+        self._file.truncate(self._HEADER.size + self._capacity * self._SLOT.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._write_header()
+    
+    def _close_map(self) -> None:
+        """Unmap and close the journal file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _write_header(self) -> None:
+        """Store capacity and used slot count in the header."""
+        self._HEADER.pack_into(self._map, 0, self.MAGIC, self.VERSION, self._capacity, self._used)
+    
+    @staticmethod
+    def _key(file_path: str) -> int:
+        """64-bit key of a path (never 0, which marks an empty slot)."""
+        digest = hashlib.blake2b(file_path.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+    
+    def _find(self, key: int) -> Tuple[int, bool]:
+        """
+        Find the slot of a key.
+        
+        Returns:
+            (slot offset, True if the key is stored there)
+        """
+        mask = self._capacity - 1
+        index = key & mask
+        
+        while True:
+            offset = self._HEADER.size + index * self._SLOT.size
+            slot_key = self._SLOT.unpack_from(self._map, offset)[0]
+            if slot_key == key:
+                return offset, True
+            if slot_key == 0:
+                return offset, False
+            index = (index + 1) & mask
+    
+    def get(self, file_path: str) -> Optional[Fingerprint]:
+        """
+        Get the fingerprint a file had when it was last indexed.
+        
+        Args:
+            file_path: File path
+        
+        Returns:
+            (mtime_ns, size, head_hash), or None if not recorded
+        """
+        with self._lock:
+            offset, found = self._find(self._key(file_path))
+            if not found:
+                return None
+            
+            _, mtime_ns, size, head_hash = self._SLOT.unpack_from(self._map, offset)
+        
+        if size == self._REMOVED:
+            return None
+        return mtime_ns, size, head_hash
+    
+    def put(self, file_path: str, fingerprint: Fingerprint) -> None:
+        """
+        Record the fingerprint of an indexed file.
+        
+        Args:
+            file_path: File path
+            fingerprint: (mtime_ns, size, head_hash)
+        """
+        key = self._key(file_path)
+        
+        with self._lock:
+            offset, found = self._find(key)
+            
+            if not found:
+                if (self._used + 1) > self._capacity * self.MAX_LOAD:
+                    self._grow()
+                    offset, _ = self._find(key)
+                self._used += 1
+                self._write_header()
+            
+            self._SLOT.pack_into(self._map, offset, key, *fingerprint)
+    
+    def discard(self, file_path: str) -> None:
+        """
+        Forget a file (e.g. after it was deleted).
+        
+        Args:
+            file_path: File path
+        """
+        with self._lock:
+            offset, found = self._find(self._key(file_path))
+            if found:
+                key = self._SLOT.unpack_from(self._map, offset)[0]
+                self._SLOT.pack_into(self._map, offset, key, 0, self._REMOVED, 0)
+    
+    def _grow(self) -> None:
+        """Drop discarded entries, doubling the number of slots if still needed."""
+        entries = []
+        for index in range(self._capacity):
+            slot = self._SLOT.unpack_from(self._map, self._HEADER.size + index * self._SLOT.size)
+            if slot[0] != 0 and slot[2] != self._REMOVED:
+                entries.append(slot)
+        
+        bits = self._capacity.bit_length() - 1
+        if (len(entries) + 1) * 2 > self._capacity * self.MAX_LOAD:
+            bits += 1  # Still over half full without the discarded entries
+        self._create(bits)
+        
+        for slot in entries:
+            offset, _ = self._find(slot[0])
+            self._SLOT.pack_into(self._map, offset, *slot)
+        
+        self._used = len(entries)
+        self._write_header()
+        
+        logger.debug(f"Index journal resized to {self._capacity} slots")
+    
+    def clear(self) -> None:
+        """Forget all files (e.g. after the vector store was reset)."""
+        with self._lock:
+            self._create(self._capacity.bit_length() - 1)
+    
+    def flush(self) -> None:
+        """Write changes to disk."""
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+    
+    def close(self) -> None:
+        """Flush and close the journal."""
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+            self._close_map()
+    
+    def __len__(self) -> int:
+        """Number of used slots, including discarded entries."""
+        return self._used
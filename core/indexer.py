@@ -2,19 +2,187 @@
 Document indexing orchestration.
 """
 
+import collections
+import itertools
 import logging
-from typing import List, Optional, Callable, Dict, Any
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import TYPE_CHECKING, List, Optional, Callable, Dict, Any, Iterable, Iterator, Tuple
 from pathlib import Path
 import hashlib
 import time
 
 from .file_loader import FileLoader
 from .chunker import TextChunker
-from .embeddings import EmbeddingGenerator
-from .vector_store import VectorStore
+
+# Imported lazily by the core package, so indexing worker processes never
+# load torch or chromadb
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingGenerator
+    from .vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
+# Loader and chunker of a parallel indexing worker process (see _init_worker)
+_worker_loader: Optional[FileLoader] = None
+_worker_chunker: Optional[TextChunker] = None
+
+
+def _prefetch(path: Path) -> None:
+    """
+    Ask the kernel to start reading a file into the page cache.
+    
+    Returns immediately; the read happens in the background, so the
+    loader's later open/read is served from memory. No-op where
+    posix_fadvise is unavailable (Windows, macOS).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _init_worker(file_loader: FileLoader, chunker: TextChunker) -> None:
+    """Set up a worker process of DocumentIndexer's process pool."""
+    global _worker_loader, _worker_chunker
+    _worker_loader = file_loader
+    _worker_chunker = chunker
+
+
+def _load_and_chunk(file_path: str, file_hash: str) -> List[Dict[str, Any]]:
+    """
+    Load and chunk one file in a worker process.
+    
+    Args:
+        file_path: Path to the file
+        file_hash: File hash to store in the chunk metadata
+        
+    Returns:
+        List of chunks (empty if the file could not be loaded)
+    """
+    loaded = _worker_loader.load(file_path)
+    if not loaded:
+        logger.warning(f"Failed to load file: {file_path}")
+        return []
+    
+    metadata = loaded['metadata']
+    metadata['file_hash'] = file_hash
+    
+    return _worker_chunker.chunk(loaded['text'], metadata)
+
+
+class _FileDiscovery:
+    """
+    Enumerates supported files on a background thread.
+    
+    Files are handed over through a bounded queue, so indexing starts with
+    the first file found instead of after the whole tree has been walked.
+    The next PREFETCH files are read ahead into the page cache while the
+    current ones are being loaded.
+    """
+    
+    QUEUE_SIZE = 1024
+    PREFETCH = 64
+    _DONE = object()
+    
+    # Seconds between stop checks while the queue is full
+    PUT_TIMEOUT = 0.1
+    
+    def __init__(self, directory: Path, recursive: bool):
+        """
+        Start enumerating a directory.
+        
+        Args:
+            directory: Directory to search
+            recursive: Whether to search subdirectories
+        """
+        self.found = 0
+        self.finished = False
+        self._queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(directory, recursive),
+            name="FileDiscovery",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def _run(self, directory: Path, recursive: bool) -> None:
+        """Walk the directory and queue every supported file."""
+        try:
+            for path in FileLoader.iter_supported(str(directory), recursive):
+                self.found += 1
+                if not self._put(path):
+                    logger.debug("File discovery stopped")
+                    return
+        except Exception as e:
+            logger.error(f"Error enumerating {directory}: {e}")
+        finally:
+            self.finished = True
+            self._put(self._DONE)
+        
+        logger.info(f"Found {self.found} supported files")
+    
+    def _put(self, item: Any) -> bool:
+        """Queue an item, waiting for room; False if stopped meanwhile."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=self.PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def stop(self) -> None:
+        """Stop enumerating, e.g. when the consumer gives up early."""
+        self._stop.set()
+    
+    def __iter__(self) -> Iterator[Path]:
+        ahead: collections.deque = collections.deque()
+        exhausted = False
+        
+        while True:
+            while not exhausted and len(ahead) < self.PREFETCH:
+                try:
+                    # Only wait for discovery when there is nothing to hand out
+                    path = self._queue.get(block=not ahead)
+                except queue.Empty:
+                    break
+                if path is self._DONE:
+                    exhausted = True
+                    break
+                _prefetch(path)
+                ahead.append(path)
+            
+            if not ahead:
+                return
+            yield ahead.popleft()
+    
+    def total(self, done: int) -> int:
+        """
+        Best known total for progress reporting.
+        
+        Args:
+            done: Number of files processed so far
+            
+        Returns:
+            Exact count once enumeration has finished, else a lower bound
+        """
+        if self.finished:
+            return self.found
+        return max(done + 1, self.found)
+
 
 class DocumentIndexer:
     """
@@ -32,8 +200,8 @@ class DocumentIndexer:
         self,
         file_loader: FileLoader,
         chunker: TextChunker,
-        embedder: EmbeddingGenerator,
-        vector_store: VectorStore,
+        embedder: 'EmbeddingGenerator',
+        vector_store: 'VectorStore',
         batch_size: int = 50
     ):
         """
@@ -58,7 +226,9 @@ class DocumentIndexer:
         self,
         directory: str,
         recursive: bool = True,
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        workers: int = 1,
+        should_stop: Optional[Callable[[], bool]] = None
     ) -> Dict[str, Any]:
         """
         Index all supported files in a directory.
@@ -67,6 +237,9 @@ class DocumentIndexer:
             directory: Directory path to index
             recursive: Whether to index subdirectories
             progress_callback: Callback function(current, total, filename)
+            workers: Processes used to load and chunk files (1 = in-process)
+            should_stop: Polled between files; indexing ends early once it
+                returns True
             
         Returns:
             Dictionary with indexing statistics
@@ -79,37 +252,72 @@ class DocumentIndexer:
         logger.info(f"Starting indexing of directory: {directory} (recursive: {recursive})")
         start_time = time.time()
         
-        # Find all supported files
-        files = self._find_files(dir_path, recursive)
-        total_files = len(files)
-        
-        logger.info(f"Found {total_files} supported files")
-        
-        if total_files == 0:
-            return {
-                'total_files': 0,
-                'indexed_files': 0,
-                'skipped_files': 0,
-                'failed_files': 0,
-                'total_chunks': 0,
-                'duration': 0
-            }
-        
-        # Get existing file hashes to detect changes
-        existing_hashes = self._get_existing_file_hashes()
-        
         stats = {
-            'total_files': total_files,
+            'total_files': 0,
             'indexed_files': 0,
             'skipped_files': 0,
             'failed_files': 0,
             'total_chunks': 0
         }
         
-        # Process files
+        # Files are indexed while the tree is still being enumerated
+        files = _FileDiscovery(dir_path, recursive)
+        
+        try:
+            # Get existing file hashes to detect changes
+            existing_hashes = self._get_existing_file_hashes()
+            
+            if workers > 1:
+                self._index_parallel(
+                    files, existing_hashes, workers, progress_callback, stats, should_stop
+                )
+            else:
+                self._index_serial(
+                    files, existing_hashes, progress_callback, stats, should_stop
+                )
+        finally:
+            files.stop()
+        
+        duration = time.time() - start_time
+        stats['total_files'] = (
+            stats['indexed_files'] + stats['skipped_files'] + stats['failed_files']
+        )
+        stats['duration'] = duration
+        
+        logger.info(
+            f"Indexing complete: {stats['indexed_files']} indexed, "
+            f"{stats['skipped_files']} skipped, {stats['failed_files']} failed "
+            f"in {duration:.2f}s"
+        )
+        
+        return stats
+    
+    def _index_serial(
+        self,
+        files: "_FileDiscovery",
+        existing_hashes: Dict[str, str],
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        stats: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> None:
+        """
+        Load, chunk and embed files one after another in this process.
+        
+        Args:
+            files: Files to index, as they are discovered
+            existing_hashes: Hashes of already indexed files
+            progress_callback: Callback function(current, total, filename)
+            stats: Statistics to update
+            should_stop: Polled before each file; stops indexing once it
+                returns True
+        """
         for i, file_path in enumerate(files):
+            if should_stop and should_stop():
+                logger.info("Indexing interrupted")
+                break
+            
             if progress_callback:
-                progress_callback(i + 1, total_files, file_path.name)
+                progress_callback(i + 1, files.total(i + 1), file_path.name)
             
             try:
                 # Check if file needs reindexing
@@ -136,17 +344,132 @@ class DocumentIndexer:
             except Exception as e:
                 logger.error(f"Error indexing {file_path.name}: {e}")
                 stats['failed_files'] += 1
+    
+    def _index_parallel(
+        self,
+        files: "_FileDiscovery",
+        existing_hashes: Dict[str, str],
+        workers: int,
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        stats: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> None:
+        """
+        Load and chunk files in a process pool, embedding in this process.
         
-        duration = time.time() - start_time
-        stats['duration'] = duration
+        Loading (PDF parsing, OCR) and chunking are CPU-bound and spread over
+        the workers; chunks from all files are pooled into full embedding
+        batches here. At most a few files per worker are in flight, which
+        bounds the memory held by finished but not yet embedded files.
         
-        logger.info(
-            f"Indexing complete: {stats['indexed_files']} indexed, "
-            f"{stats['skipped_files']} skipped, {stats['failed_files']} failed "
-            f"in {duration:.2f}s"
-        )
+        Args:
+            files: Files to index, as they are discovered
+            existing_hashes: Hashes of already indexed files
+            workers: Number of worker processes
+            progress_callback: Callback function(current, total, filename)
+            stats: Statistics to update
+            should_stop: Polled after each file; once it returns True, queued
+                files are cancelled and only running ones are waited for
+        """
+        pending_chunks: List[Dict[str, Any]] = []
+        queued = self._changed_files(files, existing_hashes, stats)
+        
+        # Forking a process with running threads (Qt, the file watcher, the
+        # logging listener) can deadlock the child on a lock held at fork time
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.file_loader, self.chunker)
+        ) as executor:
+            running = {
+                executor.submit(_load_and_chunk, path, file_hash): path
+                for path, file_hash in itertools.islice(queued, workers * 4)
+            }
+            
+            while running:
+                if should_stop and should_stop():
+                    logger.info("Indexing interrupted")
+                    for future in running:
+                        future.cancel()
+                    break
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                
+                for future in finished:
+                    path = running.pop(future)
+                    for next_path, next_hash in itertools.islice(queued, 1):
+                        running[executor.submit(_load_and_chunk, next_path, next_hash)] = next_path
+                    
+                    try:
+                        chunks = future.result()
+                    except Exception as e:
+                        logger.error(f"Error indexing {Path(path).name}: {e}")
+                        chunks = []
+                    
+                    if chunks:
+                        stats['indexed_files'] += 1
+                    else:
+                        stats['failed_files'] += 1
+                    
+                    if progress_callback:
+                        done = (
+                            stats['indexed_files'] + stats['skipped_files'] + stats['failed_files']
+                        )
+                        progress_callback(done, files.total(done), Path(path).name)
+                    
+                    if not chunks:
+                        continue
+                    
+                    stats['total_chunks'] += len(chunks)
+                    pending_chunks.extend(chunks)
+                    
+                    while len(pending_chunks) >= self.batch_size:
+                        self._process_batch(pending_chunks[:self.batch_size])
+                        del pending_chunks[:self.batch_size]
         
-        return stats
+        if pending_chunks:
+            self._process_batch(pending_chunks)
+    
+    def _changed_files(
+        self,
+        files: Iterable[Path],
+        existing_hashes: Dict[str, str],
+        stats: Dict[str, Any]
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield files that are new or changed since they were last indexed.
+        
+        Unchanged and unreadable files are counted in stats; old chunks of
+        changed files are removed before they are yielded.
+        
+        Args:
+            files: Candidate files
+            existing_hashes: Hashes of already indexed files
+            stats: Statistics to update
+            
+        Yields:
+            Tuples of (file path, file hash)
+        """
+        for file_path in files:
+            try:
+                file_hash = self._compute_file_hash(file_path)
+            except Exception as e:
+                logger.error(f"Error indexing {file_path.name}: {e}")
+                stats['failed_files'] += 1
+                continue
+            
+            path = str(file_path)
+            
+            if existing_hashes.get(path) == file_hash:
+                logger.debug(f"Skipping unchanged file: {file_path.name}")
+                stats['skipped_files'] += 1
+                continue
+            
+            if path in existing_hashes:
+                self._remove_file_chunks(path)
+            
+            yield path, file_hash
     
     def index_file(self, file_path: str, file_hash: Optional[str] = None) -> int:
         """
@@ -192,6 +515,77 @@ class DocumentIndexer:
         logger.info(f"Indexed {total_chunks} chunks from {Path(file_path).name}")
         return total_chunks
     
+    def index_files(self, file_paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        Index several files, embedding their chunks together.
+        
+        Chunks from all files are pooled, so small files share embedding
+        batches instead of each paying for its own forward pass. Previously
+        indexed chunks of the files are replaced.
+        
+        Args:
+            file_paths: Paths of the files to (re-)index
+            
+        Returns:
+            Dictionary with indexing statistics; 'indexed_paths' lists the
+            files whose chunks were stored
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        start_time = time.time()
+        
+        stats = {
+            'total_files': len(file_paths),
+            'indexed_files': 0,
+            'skipped_files': 0,
+            'failed_files': 0,
+            'total_chunks': 0
+        }
+        
+        all_chunks = []
+        indexed = []
+        
+        for file_path in file_paths:
+            try:
+                loaded = self.file_loader.load(file_path)
+                if not loaded:
+                    logger.warning(f"Failed to load file: {file_path}")
+                    stats['failed_files'] += 1
+                    continue
+                
+                metadata = loaded['metadata']
+                metadata['file_hash'] = self._compute_file_hash(Path(file_path))
+                
+                chunks = self.chunker.chunk(loaded['text'], metadata)
+                if not chunks:
+                    logger.warning(f"No chunks created for: {file_path}")
+                    stats['failed_files'] += 1
+                    continue
+                
+                all_chunks.extend(chunks)
+                indexed.append(file_path)
+                
+            except Exception as e:
+                logger.error(f"Error indexing {Path(file_path).name}: {e}")
+                stats['failed_files'] += 1
+        
+        if indexed:
+            self._remove_files_chunks(indexed)
+        
+        for batch_start in range(0, len(all_chunks), self.batch_size):
+            self._process_batch(all_chunks[batch_start:batch_start + self.batch_size])
+        
+        stats['indexed_files'] = len(indexed)
+        stats['indexed_paths'] = indexed
+        stats['total_chunks'] = len(all_chunks)
+        stats['duration'] = time.time() - start_time
+        
+        logger.info(
+            f"Indexed {stats['total_chunks']} chunks from {stats['indexed_files']} files "
+            f"in {stats['duration']:.2f}s"
+        )
+        
+        return stats
+    
     def _process_batch(self, batch: List[Dict[str, Any]]) -> None:
         """
         Process a batch of chunks: embed and store.
@@ -226,18 +620,6 @@ class DocumentIndexer:
             metadatas=metadatas
         )
     
-    def _find_files(self, directory: Path, recursive: bool) -> List[Path]:
-        """Find all supported files in directory."""
-        files = []
-        
-        pattern = "**/*" if recursive else "*"
-        
-        for path in directory.glob(pattern):
-            if path.is_file() and FileLoader.is_supported(str(path)):
-                files.append(path)
-        
-        return sorted(files)
-    
     def _compute_file_hash(self, file_path: Path) -> str:
         """Compute MD5 hash of file for change detection."""
         hasher = hashlib.md5()
@@ -281,9 +663,125 @@ class DocumentIndexer:
         except Exception as e:
             logger.error(f"Error removing old chunks: {e}")
     
+    def _remove_files_chunks(self, file_paths: List[str]) -> None:
+        """Remove all chunks associated with any of the given files."""
+        try:
+            results = self.vector_store.get_by_filter({'file_path': {'$in': file_paths}})
+            
+            if results['ids']:
+                self.vector_store.delete_documents(results['ids'])
+                logger.debug(f"Removed {len(results['ids'])} old chunks for {len(file_paths)} files")
+                
+        except Exception as e:
+            logger.error(f"Error removing old chunks: {e}")
+    
     @staticmethod
     def _generate_chunk_id(file_path: str, chunk_index: int) -> str:
         """Generate unique ID for a chunk."""
         # Use hash of file path + chunk index
         unique_str = f"{file_path}::{chunk_index}"
-        return hashlib.md5(unique_str.encode()).hexdigest()
\ No newline at end of file
+        return hashlib.md5(unique_str.encode()).hexdigest()
+
+
+class IndexQueue:
+    """
+    Background queue that batches file (re-)index requests.
+    
+    Paths are collected until max_batch distinct paths are waiting or
+    max_wait seconds have passed since the first one, then indexed together
+    with DocumentIndexer.index_files.
+    """
+    
+    def __init__(
+        self,
+        indexer: DocumentIndexer,
+        max_batch: int = 64,
+        max_wait: float = 0.5,
+        on_indexed: Optional[Callable[[List[str]], None]] = None
+    ):
+        """
+        Initialize the queue.
+        
+        Args:
+            indexer: Indexer used to index the collected files
+            max_batch: Maximum number of files indexed together
+            max_wait: Seconds to wait for more files after the first one
+            on_indexed: Callback with the paths of each batch that were
+                indexed successfully
+        """
+        self.indexer = indexer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.on_indexed = on_indexed
+        
+        # SimpleQueue: no task tracking, and put() never blocks the watcher
+        self._queue = queue.SimpleQueue()  # file paths, or None to stop
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start the background thread."""
+        if self._thread is not None:
+            return
+        
+        self._thread = threading.Thread(
+            target=self._run,
+            name="IndexQueue",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Index whatever is still queued and stop the background thread."""
+        if self._thread is None:
+            return
+        
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+    
+    def put(self, file_path: str) -> None:
+        """
+        Queue a file for (re-)indexing.
+        
+        Args:
+            file_path: Path of the created or modified file
+        """
+        self._queue.put(file_path)
+    
+    def _run(self) -> None:
+        """Collect batches of paths and index them."""
+        stopping = False
+        
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            batch = {item: None}
+            deadline = time.monotonic() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                try:
+                    # Take what is already queued without touching the clock
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch[item] = None
+            
+            logger.debug(f"Indexing batch of {len(batch)} files")
+            
+            try:
+                stats = self.indexer.index_files(batch)
+                if self.on_indexed and stats['indexed_paths']:
+                    self.on_indexed(stats['indexed_paths'])
+            except Exception as e:
+                logger.error(f"Error indexing batch: {e}")
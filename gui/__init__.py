@@ -12,12 +12,14 @@ from .main_window import MainWindow
 from .search_tab import SearchTab
 from .chat_tab import ChatTab
 from .settings_dialog import SettingsDialog
+from .indexer_worker import IndexerWorker
 
 __all__ = [
     'MainWindow',
     'SearchTab',
     'ChatTab',
     'SettingsDialog',
+    'IndexerWorker',
 ]
 
 __version__ = '0.1.0'
\ No newline at end of file
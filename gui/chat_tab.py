@@ -11,6 +11,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal, QThread
 from PySide6.QtGui import QFont, QTextCursor
 
+from llm import ChunkBatch
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,17 +94,20 @@ class ChatWorker(QThread):
             )
             
             # Prepare context chunks
-            context_chunks = []
+            texts = []
+            file_names = []
             for result in search_results:
                 if hasattr(result, 'to_dict'):
                     result_dict = result.to_dict()
                 else:
                     result_dict = result
                 
-                context_chunks.append({
-                    'text': result_dict.get('text', ''),
-                    'metadata': result_dict.get('metadata', {})
-                })
+                texts.append(result_dict.get('text', ''))
+                file_names.append(
+                    result_dict.get('metadata', {}).get('file_name', 'Unknown')
+                )
+            
+            context_chunks = ChunkBatch(texts=texts, file_names=file_names)
             
             # Generate answer
             logger.debug("Generating answer with LLM")
@@ -110,9 +115,7 @@ class ChatWorker(QThread):
             if self.llm.supports_streaming:
                 # Streaming response
                 full_response = ""
-                for chunk in self.llm.generate_stream(
-                    self.llm._build_rag_prompt(self.question, context_chunks)
-                ):
+                for chunk in self.llm.answer_question_stream(self.question, context_chunks):
                     full_response += chunk
                     self.chunk_received.emit(chunk)
                 
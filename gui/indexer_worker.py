@@ -0,0 +1,39 @@
+"""
+Background worker for directory indexing.
+"""
+
+from PySide6.QtCore import QThread, Signal
+
+
+class IndexerWorker(QThread):
+    """Worker thread for directory indexing."""
+    
+    progress = Signal(int, int, str)  # current, total, filename
+    indexing_complete = Signal(dict)  # indexing statistics
+    error_occurred = Signal(str)
+    
+    def __init__(self, indexer, folder_path: str, recursive: bool = True, workers: int = 1):
+        super().__init__()
+        self.indexer = indexer
+        self.folder_path = folder_path
+        self.recursive = recursive
+        self.workers = workers
+    
+    def run(self):
+        """
+        Index the folder, reporting progress through signals.
+        
+        Stops after the current file once requestInterruption() is called.
+        """
+        try:
+            stats = self.indexer.index_directory(
+                directory=self.folder_path,
+                recursive=self.recursive,
+                progress_callback=self.progress.emit,
+                workers=self.workers,
+                should_stop=self.isInterruptionRequested
+            )
+            self.indexing_complete.emit(stats)
+            
+        except Exception as e:
+            self.error_occurred.emit(str(e))
@@ -11,15 +11,17 @@ Supports:
 - Online APIs (OpenAI, Anthropic, etc.)
 """
 
-from .base import BaseLLM, LLMConfig, LLMResponse
-from .local_model import LocalLLM
+from .base import BaseLLM, ChunkBatch, LLMConfig, LLMResponse
+from .local_model import LocalLLM, BatchingLocalLLM
 from .api_model import APILLM
 
 __all__ = [
     'BaseLLM',
     'LLMConfig',
     'LLMResponse',
+    'ChunkBatch',
     'LocalLLM',
+    'BatchingLocalLLM',
     'APILLM',
 ]
 
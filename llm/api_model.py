@@ -2,8 +2,10 @@
 API-based LLM implementation (OpenAI, Anthropic, etc.).
 """
 
+import asyncio
 import logging
-from typing import Iterator, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Dict, Any, List, Optional
 
 from .base import BaseLLM, LLMConfig, LLMResponse
 
@@ -30,6 +32,10 @@ class APILLM(BaseLLM):
         super().__init__(config)
         
         self.client = None
+        
+        # Async clients per event loop, created on first agenerate() in that
+        # loop (their connections cannot be used from another loop)
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Any] = {}
         self.provider = config.api_provider.lower()
         
         self._check_dependencies()
@@ -62,7 +68,7 @@ class APILLM(BaseLLM):
         Returns:
             True if successful, False otherwise
         """
-        if self._is_loaded:
+        if self.is_loaded:
             logger.info("API client already initialized")
             return True
         
@@ -75,7 +81,7 @@ class APILLM(BaseLLM):
                 logger.error(f"Unsupported API provider: {self.provider}")
                 return False
             
-            self._is_loaded = True
+            self.is_loaded = True
             logger.info(f"API client initialized for {self.provider}")
             return True
             
@@ -104,10 +110,14 @@ class APILLM(BaseLLM):
     
     def unload(self) -> None:
         """Clean up API client."""
+        for loop, client in self._async_clients.items():
+            self._close_async_client(loop, client)
+        self._async_clients.clear()
+        
         if self.client is not None:
             logger.info("Cleaning up API client")
             self.client = None
-            self._is_loaded = False
+            self.is_loaded = False
     
     def generate(
         self,
@@ -126,7 +136,7 @@ class APILLM(BaseLLM):
         Returns:
             LLMResponse with generated text
         """
-        if not self._is_loaded:
+        if not self.is_loaded:
             return LLMResponse(
                 text="",
                 error="API client not initialized. Please load first."
@@ -150,20 +160,149 @@ class APILLM(BaseLLM):
                 error=str(e)
             )
     
+    def batch_generate(
+        self,
+        prompts: List[str],
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate text for several prompts concurrently.
+        
+        Up to config.n_parallel requests are in flight at once.
+        
+        Args:
+            prompts: Input prompts
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            One LLMResponse per prompt, in the same order
+        """
+        workers = min(len(prompts), max(1, self.config.n_parallel))
+        if workers <= 1:
+            return super().batch_generate(prompts, **kwargs)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda p: self.generate(p, **kwargs), prompts))
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Generate text using the provider's async client.
+        
+        The async client is created once per event loop and reused, so its
+        pooled keep-alive connections are shared by all calls in that loop.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            LLMResponse with generated text
+        """
+        if not self.is_loaded:
+            return LLMResponse(
+                text="",
+                error="API client not initialized. Please load first."
+            )
+        
+        try:
+            client = self._get_async_client()
+            
+            if self.provider == "openai":
+                params = self._openai_params(prompt, **kwargs)
+                logger.debug(f"Calling OpenAI API (async) with model: {params['model']}")
+                response = await client.chat.completions.create(**params)
+                return self._openai_response(response, params['model'])
+            elif self.provider == "anthropic":
+                params = self._anthropic_params(prompt, **kwargs)
+                logger.debug(f"Calling Anthropic API (async) with model: {params['model']}")
+                response = await client.messages.create(**params)
+                return self._anthropic_response(response, params['model'])
+            else:
+                return LLMResponse(
+                    text="",
+                    error=f"Unsupported provider: {self.provider}"
+                )
+                
+        except Exception as e:
+            logger.error(f"Error generating text: {e}")
+            return LLMResponse(
+                text="",
+                error=str(e)
+            )
+    
+    def _get_async_client(self):
+        """Get the async client of the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        
+        client = self._async_clients.get(loop)
+        if client is None:
+            # Forget clients of loops that were closed (e.g. by asyncio.run)
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+            
+            client = self._async_clients[loop] = self._create_async_client()
+        
+        return client
+    
+    @staticmethod
+    def _close_async_client(loop: asyncio.AbstractEventLoop, client) -> None:
+        """Close an async client on the event loop it belongs to."""
+        if loop.is_closed():
+            return  # Its connections were dropped with the loop
+        
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            else:
+                loop.run_until_complete(client.close())
+        except Exception as e:
+            logger.debug(f"Error closing async API client: {e}")
+    
+    def _create_async_client(self):
+        """Create the async client for the configured provider."""
+        if self.provider == "openai":
+            from openai import AsyncOpenAI
+            
+            kwargs = {'api_key': self.config.api_key}
+            
+            if self.config.api_base_url:
+                kwargs['base_url'] = self.config.api_base_url
+            
+            return AsyncOpenAI(**kwargs)
+        
+        elif self.provider == "anthropic":
+            from anthropic import AsyncAnthropic
+            
+            return AsyncAnthropic(api_key=self.config.api_key)
+        
+        raise ValueError(f"Unsupported provider: {self.provider}")
+    
     def _generate_openai(self, prompt: str, **kwargs) -> LLMResponse:
         """Generate using OpenAI API."""
-        params = {
+        params = self._openai_params(prompt, **kwargs)
+        
+        logger.debug(f"Calling OpenAI API with model: {params['model']}")
+        
+        response = self.client.chat.completions.create(**params)
+        
+        return self._openai_response(response, params['model'])
+    
+    def _openai_params(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Build OpenAI request parameters."""
+        return {
             'model': kwargs.get('model', self.config.api_model),
             'messages': [{'role': 'user', 'content': prompt}],
             'max_tokens': kwargs.get('max_tokens', self.config.max_tokens),
             'temperature': kwargs.get('temperature', self.config.temperature),
             'top_p': kwargs.get('top_p', self.config.top_p),
         }
-        
-        logger.debug(f"Calling OpenAI API with model: {params['model']}")
-        
-        response = self.client.chat.completions.create(**params)
-        
+    
+    def _openai_response(self, response, model: str) -> LLMResponse:
+        """Convert an OpenAI completion to an LLMResponse."""
         text = response.choices[0].message.content
         
         usage = {
@@ -179,25 +318,33 @@ class APILLM(BaseLLM):
             usage=usage,
             metadata={
                 'provider': 'openai',
-                'model': params['model'],
+                'model': model,
                 'finish_reason': response.choices[0].finish_reason
             }
         )
     
     def _generate_anthropic(self, prompt: str, **kwargs) -> LLMResponse:
         """Generate using Anthropic API."""
-        params = {
+        params = self._anthropic_params(prompt, **kwargs)
+        
+        logger.debug(f"Calling Anthropic API with model: {params['model']}")
+        
+        response = self.client.messages.create(**params)
+        
+        return self._anthropic_response(response, params['model'])
+    
+    def _anthropic_params(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Build Anthropic request parameters."""
+        return {
             'model': kwargs.get('model', self.config.api_model),
             'messages': [{'role': 'user', 'content': prompt}],
             'max_tokens': kwargs.get('max_tokens', self.config.max_tokens),
             'temperature': kwargs.get('temperature', self.config.temperature),
             'top_p': kwargs.get('top_p', self.config.top_p),
         }
-        
-        logger.debug(f"Calling Anthropic API with model: {params['model']}")
-        
-        response = self.client.messages.create(**params)
-        
+    
+    def _anthropic_response(self, response, model: str) -> LLMResponse:
+        """Convert an Anthropic message to an LLMResponse."""
         text = response.content[0].text
         
         usage = {
@@ -213,7 +360,7 @@ class APILLM(BaseLLM):
             usage=usage,
             metadata={
                 'provider': 'anthropic',
-                'model': params['model'],
+                'model': model,
                 'stop_reason': response.stop_reason
             }
         )
@@ -233,7 +380,7 @@ class APILLM(BaseLLM):
         Yields:
             Text chunks as they are generated
         """
-        if not self._is_loaded:
+        if not self.is_loaded:
             logger.error("API client not initialized")
             yield "[Error: API client not initialized]"
             return
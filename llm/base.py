@@ -2,15 +2,47 @@
 Base classes and interfaces for LLM integration.
 """
 
+import asyncio
+import hashlib
+import io
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Iterator
+from typing import List, Dict, Any, Optional, Iterator, Callable, ClassVar, Iterable, Tuple, Union
 from enum import Enum
 
+import numpy as np
+
+try:
+    from blake3 import blake3
+except ImportError:  # Optional, falls back to hashlib.blake2b
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
 
+# Static parts of the RAG prompt (see BaseLLM._build_rag_segments)
+RAG_PROMPT_HEADER = (
+    "You are a helpful assistant that answers questions based on the provided documents.\n"
+    "\n"
+    "Context:\n"
+)
+
+RAG_QUESTION_PREFIX = "\n\nQuestion: "
+
+RAG_PROMPT_INSTRUCTIONS = (
+    "\n"
+    "\n"
+    "Instructions:\n"
+    "- Answer based only on the information in the provided documents\n"
+    "- If the answer is not in the documents, say \"I cannot find that information in the provided documents\"\n"
+    "- Cite which document(s) you used to answer\n"
+    "- Be concise and accurate\n"
+    "\n"
+    "Answer:"
+)
+
+
 class LLMMode(Enum):
     """LLM operation modes."""
     NONE = "none"
@@ -25,7 +57,7 @@ class APIProvider(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMConfig:
     """Configuration for LLM."""
     mode: str = "none"  # "none", "local", "api"
@@ -35,6 +67,8 @@ class LLMConfig:
     n_ctx: int = 4096  # Context window size
     n_threads: int = 4  # CPU threads
     n_gpu_layers: int = 0  # GPU acceleration (0 = CPU only)
+    kv_cache_mb: int = 2048  # Budget for cached context KV states
+    use_cuda_graphs: bool = True  # Replay decode kernels as CUDA graphs (GPU only)
     
     # API settings
     api_provider: Optional[str] = None  # "openai", "anthropic"
@@ -46,10 +80,28 @@ class LLMConfig:
     temperature: float = 0.7
     max_tokens: int = 1000
     top_p: float = 0.9
+    n_parallel: int = 4  # Max concurrent generations in batch_generate
     
     # RAG settings
     max_context_chunks: int = 5  # Max chunks to include in context
     
+    # Semantic answer cache (enabled once an embedder is set)
+    semantic_cache_size: int = 128  # 0 disables the cache
+    semantic_cache_threshold: float = 0.95  # Min cosine similarity for a hit
+    
+    # Per-mode checks; each returns an error message or None if valid
+    _VALIDATORS: ClassVar[Dict[str, Callable[['LLMConfig'], Optional[str]]]] = {
+        "none": lambda c: None,
+        "local": lambda c: (
+            None if c.local_model_path
+            else "local_model_path required for local mode"
+        ),
+        "api": lambda c: (
+            None if c.api_key and c.api_provider
+            else "api_key and api_provider required for API mode"
+        ),
+    }
+    
     def validate(self) -> bool:
         """
         Validate configuration.
@@ -57,27 +109,20 @@ class LLMConfig:
         Returns:
             True if valid, False otherwise
         """
-        if self.mode == "none":
-            return True
-        
-        elif self.mode == "local":
-            if not self.local_model_path:
-                logger.error("local_model_path required for local mode")
-                return False
-            return True
-        
-        elif self.mode == "api":
-            if not self.api_key or not self.api_provider:
-                logger.error("api_key and api_provider required for API mode")
-                return False
-            return True
-        
-        else:
+        validator = self._VALIDATORS.get(self.mode)
+        if validator is None:
             logger.error(f"Invalid mode: {self.mode}")
             return False
+        
+        error = validator(self)
+        if error:
+            logger.error(error)
+            return False
+        
+        return True
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """Response from LLM."""
     text: str
@@ -91,6 +136,229 @@ class LLMResponse:
         return self.error is None
 
 
+@dataclass
+class ChunkBatch:
+    """
+    Retrieved chunks as parallel lists.
+    
+    Can be passed wherever a list of chunk dicts is accepted as context;
+    building the prompt then needs no per-chunk dict lookups.
+    """
+    texts: List[str]
+    file_names: List[str]
+    
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict[str, Any]]) -> 'ChunkBatch':
+        """Convert a list of chunk dicts with 'text' and 'metadata'."""
+        return cls(
+            texts=[chunk.get('text', '') for chunk in chunks],
+            file_names=[
+                chunk.get('metadata', {}).get('file_name', 'Unknown')
+                for chunk in chunks
+            ]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __getitem__(self, index: slice) -> 'ChunkBatch':
+        return ChunkBatch(self.texts[index], self.file_names[index])
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return zip(self.texts, self.file_names)
+
+
+def iter_chunks(
+    context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+) -> Iterable[Tuple[str, str]]:
+    """
+    Iterate (text, file_name) pairs of context chunks.
+    
+    Args:
+        context_chunks: List of chunk dicts or a ChunkBatch
+        
+    Returns:
+        Iterable of (text, file_name) tuples
+    """
+    if isinstance(context_chunks, ChunkBatch):
+        return context_chunks
+    
+    return (
+        (chunk.get('text', ''), chunk.get('metadata', {}).get('file_name', 'Unknown'))
+        for chunk in context_chunks
+    )
+
+
+class SemanticCache:
+    """
+    Cache of LLM answers keyed by question similarity.
+    
+    A question is a hit if it matches a cached one exactly, or if its
+    embedding has cosine similarity above the threshold with a cached
+    question asked over the same context. Least recently used entries are
+    evicted once capacity is reached.
+    """
+    
+    def __init__(
+        self,
+        embed: Callable[[str], np.ndarray],
+        capacity: int = 128,
+        threshold: float = 0.95
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            embed: Function returning an L2-normalized embedding for a question
+            capacity: Maximum number of cached answers
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.embed = embed
+        self.capacity = capacity
+        self.threshold = threshold
+        
+        self._embeddings: Optional[np.ndarray] = None  # (capacity, dim)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._exact_keys: List[Optional[bytes]] = [None] * capacity
+        self._context_keys: List[Optional[bytes]] = [None] * capacity
+        self._responses: List[Optional[LLMResponse]] = [None] * capacity
+        self._slots: Dict[bytes, int] = {}  # {exact_key: slot}
+        self._size = 0
+        self._clock = 0
+        
+        # Embedding of the last looked up question, reused when it is stored
+        self._last_embedding: Optional[Tuple[str, np.ndarray]] = None
+    
+    def get_or_compute(
+        self,
+        question: str,
+        context_key: bytes,
+        compute: Callable[[], LLMResponse]
+    ) -> LLMResponse:
+        """
+        Return a cached answer, or compute and cache a new one.
+        
+        Args:
+            question: User's question
+            context_key: Fingerprint of the context the answer depends on
+            compute: Function producing the answer on a miss
+            
+        Returns:
+            LLMResponse (cached or freshly computed)
+        """
+        response = self.lookup(question, context_key)
+        if response is not None:
+            return response
+        
+        response = compute()
+        
+        if response.success:
+            self.put(question, context_key, response)
+        
+        return response
+    
+    def lookup(self, question: str, context_key: bytes) -> Optional[LLMResponse]:
+        """
+        Return a cached answer without computing one on a miss.
+        
+        Args:
+            question: User's question
+            context_key: Fingerprint of the context the answer depends on
+            
+        Returns:
+            Cached LLMResponse, or None
+        """
+        exact_key = BaseLLM._hash(context_key + question.encode('utf-8'))
+        
+        # Exact match: no embedding needed
+        slot = self._slots.get(exact_key)
+        if slot is not None:
+            logger.debug("Semantic cache: exact hit")
+            return self._hit(slot)
+        
+        embedding = self._embed(question)
+        
+        if self._size:
+            scores = self._embeddings[:self._size] @ embedding
+            for slot in np.argsort(scores)[::-1]:
+                if scores[slot] <= self.threshold:
+                    break
+                if self._context_keys[slot] == context_key:
+                    logger.debug(f"Semantic cache: hit (similarity {scores[slot]:.3f})")
+                    return self._hit(slot)
+        
+        return None
+    
+    def put(self, question: str, context_key: bytes, response: LLMResponse) -> None:
+        """
+        Cache an answer.
+        
+        Args:
+            question: User's question
+            context_key: Fingerprint of the context the answer depends on
+            response: Answer to cache
+        """
+        exact_key = BaseLLM._hash(context_key + question.encode('utf-8'))
+        if exact_key not in self._slots:
+            self._put(exact_key, context_key, self._embed(question), response)
+    
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        self._embeddings = None
+        self._last_used[:] = 0
+        self._exact_keys = [None] * self.capacity
+        self._context_keys = [None] * self.capacity
+        self._responses = [None] * self.capacity
+        self._slots.clear()
+        self._size = 0
+        self._last_embedding = None
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _embed(self, question: str) -> np.ndarray:
+        """Embed a question, reusing the embedding of the last lookup."""
+        if self._last_embedding is not None and self._last_embedding[0] == question:
+            return self._last_embedding[1]
+        
+        embedding = np.asarray(self.embed(question), dtype=np.float32)
+        self._last_embedding = (question, embedding)
+        return embedding
+    
+    def _hit(self, slot: int) -> LLMResponse:
+        """Mark a slot as used and return its response."""
+        self._clock += 1
+        self._last_used[slot] = self._clock
+        return self._responses[slot]
+    
+    def _put(
+        self,
+        exact_key: bytes,
+        context_key: bytes,
+        embedding: np.ndarray,
+        response: LLMResponse
+    ) -> None:
+        """Store an answer, evicting the least recently used one if full."""
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float32)
+        
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+            del self._slots[self._exact_keys[slot]]
+        
+        self._embeddings[slot] = embedding
+        self._exact_keys[slot] = exact_key
+        self._context_keys[slot] = context_key
+        self._responses[slot] = response
+        self._slots[exact_key] = slot
+        
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+
 class BaseLLM(ABC):
     """
     Abstract base class for LLM implementations.
@@ -109,7 +377,9 @@ class BaseLLM(ABC):
             raise ValueError("Invalid LLM configuration")
         
         self.config = config
-        self._is_loaded = False
+        self.is_loaded = False  # Set by load()/unload()
+        self.supports_streaming = True  # Override in subclass if not supported
+        self.semantic_cache: Optional[SemanticCache] = None
         
         logger.info(f"Initializing {self.__class__.__name__}")
     
@@ -148,6 +418,29 @@ class BaseLLM(ABC):
         """
         pass
     
+    async def agenerate(
+        self,
+        prompt: str,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Generate text without blocking the event loop.
+        
+        The default runs generate() in a worker thread. Subclasses that talk
+        to a remote service should override this with a native async client
+        that keeps its connections alive between calls. Like generate(),
+        concurrent calls on a single local model are not serialized here
+        (see BatchingLocalLLM).
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            LLMResponse with generated text
+        """
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
+    
     @abstractmethod
     def generate_stream(
         self,
@@ -169,7 +462,7 @@ class BaseLLM(ABC):
     def answer_question(
         self,
         question: str,
-        context_chunks: List[Dict[str, Any]],
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch],
         stream: bool = False
     ) -> LLMResponse:
         """
@@ -177,18 +470,168 @@ class BaseLLM(ABC):
         
         Args:
             question: User's question
-            context_chunks: Retrieved document chunks
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
             stream: Whether to stream response
             
         Returns:
             LLMResponse with answer
         """
-        # Build RAG prompt
-        prompt = self._build_rag_prompt(question, context_chunks)
+        if self.semantic_cache is None:
+            return self._answer_question(question, context_chunks, stream)
+        
+        return self.semantic_cache.get_or_compute(
+            question,
+            self._context_key(context_chunks),
+            lambda: self._answer_question(question, context_chunks, stream)
+        )
+    
+    def answer_question_stream(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> Iterator[str]:
+        """
+        Answer a question using retrieved context (RAG), with streaming.
+        
+        A cached answer is yielded as a single chunk; otherwise the streamed
+        answer is cached once it is complete.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            
+        Yields:
+            Text chunks of the answer
+        """
+        if self.semantic_cache is None:
+            yield from self._answer_question_stream(question, context_chunks)
+            return
+        
+        context_key = self._context_key(context_chunks)
         
-        # Generate answer
+        cached = self.semantic_cache.lookup(question, context_key)
+        if cached is not None:
+            yield cached.text
+            return
+        
+        parts = []
+        for chunk in self._answer_question_stream(question, context_chunks):
+            parts.append(chunk)
+            yield chunk
+        
+        text = "".join(parts)
+        if not text.startswith("[Error:"):
+            self.semantic_cache.put(question, context_key, LLMResponse(text=text.strip()))
+    
+    def _answer_question(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch],
+        stream: bool = False
+    ) -> LLMResponse:
+        """
+        Answer a question without going through the semantic cache.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            stream: Whether to stream response
+            
+        Returns:
+            LLMResponse with answer
+        """
+        prompt = self._build_answer_prompt(question, context_chunks)
         return self.generate(prompt, stream=stream)
     
+    def _answer_question_stream(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> Iterator[str]:
+        """
+        Stream an answer without going through the semantic cache.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            
+        Yields:
+            Text chunks of the answer
+        """
+        prompt = self._build_answer_prompt(question, context_chunks)
+        yield from self.generate_stream(prompt)
+    
+    def _build_answer_prompt(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> str:
+        """
+        Build the prompt used to answer a question.
+        
+        Without any context chunks the question is sent as is, since the RAG
+        instructions would only make the model refuse to answer.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            
+        Returns:
+            Prompt text
+        """
+        if not context_chunks:
+            return question
+        
+        return self._build_rag_prompt(question, context_chunks)
+    
+    def set_embedder(self, embedder) -> None:
+        """
+        Enable the semantic answer cache using an embedding generator.
+        
+        Args:
+            embedder: EmbeddingGenerator used to embed questions
+        """
+        if self.config.semantic_cache_size <= 0:
+            self.semantic_cache = None
+            return
+        
+        self.semantic_cache = SemanticCache(
+            embed=embedder.generate_query_embedding,
+            capacity=self.config.semantic_cache_size,
+            threshold=self.config.semantic_cache_threshold
+        )
+        logger.info(f"Semantic answer cache enabled (size: {self.config.semantic_cache_size})")
+    
+    def _context_key(
+        self,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> bytes:
+        """Fingerprint the chunks that would be used as context."""
+        data = b"".join(
+            text.encode('utf-8') + b"\0"
+            for text, _ in iter_chunks(context_chunks[:self.config.max_context_chunks])
+        )
+        return self._hash(data)
+    
+    @staticmethod
+    def _hash(data: bytes) -> bytes:
+        """
+        Hash bytes to a 16-byte digest for cache keys.
+        
+        Uses blake3 when installed (much faster on long chunks), otherwise
+        hashlib.blake2b. Digests are only compared within one process, so
+        the two never need to agree.
+        
+        Args:
+            data: Bytes to hash
+            
+        Returns:
+            16-byte digest
+        """
+        if blake3 is not None:
+            return blake3(data).digest(length=16)
+        return hashlib.blake2b(data, digest_size=16).digest()
+    
     def summarize_document(
         self,
         text: str,
@@ -207,17 +650,55 @@ class BaseLLM(ABC):
         prompt = self._build_summary_prompt(text, max_length)
         return self.generate(prompt)
     
+    def summarize_documents(
+        self,
+        texts: List[str],
+        max_length: Optional[int] = None
+    ) -> List[LLMResponse]:
+        """
+        Summarize several documents.
+        
+        Args:
+            texts: Document texts
+            max_length: Maximum summary length
+            
+        Returns:
+            One LLMResponse per text, in the same order
+        """
+        prompts = [self._build_summary_prompt(text, max_length) for text in texts]
+        return self.batch_generate(prompts)
+    
+    def batch_generate(
+        self,
+        prompts: List[str],
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate text for several prompts.
+        
+        The default runs the prompts one after another; subclasses that can
+        serve requests concurrently should override this.
+        
+        Args:
+            prompts: Input prompts
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            One LLMResponse per prompt, in the same order
+        """
+        return [self.generate(prompt, **kwargs) for prompt in prompts]
+    
     def _build_rag_prompt(
         self,
         question: str,
-        context_chunks: List[Dict[str, Any]]
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
     ) -> str:
         """
         Build prompt for RAG (Retrieval-Augmented Generation).
         
         Args:
             question: User's question
-            context_chunks: Retrieved chunks with 'text' and 'metadata'
+            context_chunks: Retrieved chunks (dicts with 'text' and 'metadata', or ChunkBatch)
             
         Returns:
             Formatted prompt
@@ -225,34 +706,79 @@ class BaseLLM(ABC):
         # Limit number of chunks
         chunks = context_chunks[:self.config.max_context_chunks]
         
-        # Build context string
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            text = chunk.get('text', '')
-            metadata = chunk.get('metadata', {})
-            file_name = metadata.get('file_name', 'Unknown')
+        # Same text as "".join(self._build_rag_segments(...)), written into a
+        # single buffer without per-chunk intermediate strings
+        buf = io.StringIO()
+        buf.write(RAG_PROMPT_HEADER)
+        
+        for i, (text, file_name) in enumerate(iter_chunks(chunks), 1):
+            if i > 1:
+                buf.write("\n")
+            buf.write("[Document ")
+            buf.write(str(i))
+            buf.write(": ")
+            buf.write(file_name)
+            buf.write("]\n")
+            buf.write(text)
+            buf.write("\n")
+        
+        buf.write(RAG_QUESTION_PREFIX)
+        buf.write(question)
+        buf.write(RAG_PROMPT_INSTRUCTIONS)
+        
+        return buf.getvalue()
+    
+    def _build_rag_segments(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> List[str]:
+        """
+        Build the RAG prompt as a list of consecutive segments.
+        
+        The first segment is the static header, followed by one segment per
+        document and a final segment holding the question and instructions.
+        Joining the segments yields the full prompt.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved chunks (dicts with 'text' and 'metadata', or ChunkBatch)
             
-            context_parts.append(f"[Document {i}: {file_name}]\n{text}\n")
+        Returns:
+            List of prompt segments
+        """
+        # Limit number of chunks
+        chunks = context_chunks[:self.config.max_context_chunks]
         
-        context = "\n".join(context_parts)
+        segments = self._build_context_segments(chunks)
+        segments.append(self._build_question_segment(question))
         
-        # Build prompt
-        prompt = f"""You are a helpful assistant that answers questions based on the provided documents.
-
-Context:
-{context}
-
-Question: {question}
-
-Instructions:
-- Answer based only on the information in the provided documents
-- If the answer is not in the documents, say "I cannot find that information in the provided documents"
-- Cite which document(s) you used to answer
-- Be concise and accurate
-
-Answer:"""
+        return segments
+    
+    def _build_context_segments(
+        self,
+        chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> List[str]:
+        """
+        Build the header and per-document segments of the RAG prompt.
         
-        return prompt
+        Args:
+            chunks: Document chunks (dicts with 'text' and 'metadata', or ChunkBatch)
+            
+        Returns:
+            List of prompt segments (no limit on the number of chunks)
+        """
+        segments = [RAG_PROMPT_HEADER]
+        for i, (text, file_name) in enumerate(iter_chunks(chunks), 1):
+            separator = "\n" if i > 1 else ""
+            segments.append(f"{separator}[Document {i}: {file_name}]\n{text}\n")
+        
+        return segments
+    
+    @staticmethod
+    def _build_question_segment(question: str) -> str:
+        """Build the final RAG prompt segment (question and instructions)."""
+        return f"{RAG_QUESTION_PREFIX}{question}{RAG_PROMPT_INSTRUCTIONS}"
     
     def _build_summary_prompt(
         self,
@@ -282,16 +808,6 @@ Summary:"""
         
         return prompt
     
-    @property
-    def is_loaded(self) -> bool:
-        """Check if model is loaded."""
-        return self._is_loaded
-    
-    @property
-    def supports_streaming(self) -> bool:
-        """Check if streaming is supported."""
-        return True  # Override in subclass if not supported
-    
     def get_info(self) -> Dict[str, Any]:
         """
         Get information about the LLM.
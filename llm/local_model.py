@@ -2,14 +2,53 @@
 Local LLM implementation using llama.cpp (GGUF models).
 """
 
+import asyncio
+import codecs
 import logging
-from typing import Iterator, Optional, Dict, Any
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Iterator, Optional, Dict, Any, List, Tuple, Callable, Union
 from pathlib import Path
 
-from .base import BaseLLM, LLMConfig, LLMResponse
+from .base import (
+    BaseLLM,
+    ChunkBatch,
+    LLMConfig,
+    LLMResponse,
+    RAG_PROMPT_HEADER,
+    RAG_PROMPT_INSTRUCTIONS,
+    RAG_QUESTION_PREFIX,
+)
 
 logger = logging.getLogger(__name__)
 
+# llama_cpp module, imported once per process (see _get_llama)
+_llama_mod = None
+_llama_lock = threading.Lock()
+
+
+def _get_llama():
+    """
+    Import llama_cpp on first use and return the module.
+    
+    Raises:
+        ImportError: If llama-cpp-python is not installed
+    """
+    global _llama_mod
+    
+    if _llama_mod is None:
+        with _llama_lock:
+            if _llama_mod is None:
+                import llama_cpp
+                _llama_mod = llama_cpp
+    
+    return _llama_mod
+
 
 class LocalLLM(BaseLLM):
     """
@@ -21,6 +60,25 @@ class LocalLLM(BaseLLM):
     - Streaming generation
     """
     
+    # Llama instances shared by all LocalLLM objects with the same settings
+    _model_pool: Dict[Tuple, "weakref.ref"] = {}
+    
+    # Recently unloaded models kept alive briefly: {key: (model, expires_at)}
+    _parked_models: Dict[Tuple, Tuple[Any, float]] = {}
+    _pool_lock = threading.Lock()
+    
+    # Timer releasing parked models once they expire (one at a time)
+    _reaper: Optional[threading.Timer] = None
+    
+    # How long an unloaded model stays available for a fast reload
+    POOL_TTL_SECONDS = 60.0
+    
+    # Number of tokenized document segments kept for reuse
+    CHUNK_TOKEN_CACHE_SIZE = 1024
+    
+    # Whether GGML_CUDA_DISABLE_GRAPHS was set by us rather than the user
+    _set_disable_graphs = False
+    
     def __init__(self, config: LLMConfig):
         """
         Initialize local LLM.
@@ -31,19 +89,32 @@ class LocalLLM(BaseLLM):
         super().__init__(config)
         
         self.model = None
+        
+        # KV-cache snapshots of prefilled context (LRU)
+        self._kv_cache = OrderedDict()  # {segment_chain_hash: LlamaState}
+        self._kv_cache_bytes = 0
+        
+        # Preloaded corpus for cache-augmented generation
+        self._corpus_state = None
+        self._corpus_text = ""
+        
+        # Pre-tokenized static parts of the RAG prompt (set on load)
+        self._rag_prefix_tokens: List[int] = []
+        self._rag_question_tokens: List[int] = []
+        self._rag_suffix_tokens: List[int] = []
+        self._chunk_tok_cache = OrderedDict()  # {segment_hash: token_ids}
+        
         self._check_dependencies()
     
     def _check_dependencies(self):
         """Check if llama-cpp-python is installed."""
         try:
-            import llama_cpp
-            self.has_llama_cpp = True
+            _get_llama()
         except ImportError:
             logger.error(
                 "llama-cpp-python not installed. "
                 "Install with: pip install llama-cpp-python"
             )
-            self.has_llama_cpp = False
             raise ImportError("llama-cpp-python required for local models")
     
     def load(self) -> bool:
@@ -53,25 +124,39 @@ class LocalLLM(BaseLLM):
         Returns:
             True if successful, False otherwise
         """
-        if self._is_loaded:
+        if self.is_loaded:
             logger.info("Model already loaded")
             return True
         
-        if not self.has_llama_cpp:
-            logger.error("llama-cpp-python not available")
-            return False
-        
         model_path = Path(self.config.local_model_path)
         
         if not model_path.exists():
             logger.error(f"Model file not found: {model_path}")
             return False
         
-        logger.info(f"Loading model from: {model_path}")
+        if not self.is_gguf_file(str(model_path)):
+            logger.error(f"Not a GGUF model file: {model_path}")
+            return False
+        
+        key = self._pool_key(model_path)
+        
+        with self._pool_lock:
+            self._purge_parked(keep=key)
+            ref = self._model_pool.get(key)
+            self.model = ref() if ref is not None else None
+        
+        if self.model is not None:
+            logger.info("Reusing loaded model: %s", model_path)
+            self._prepare_rag_tokens()
+            self.is_loaded = True
+            return True
+        
+        logger.info("Loading model from: %s", model_path)
         
         try:
-            from llama_cpp import Llama
+            Llama = _get_llama().Llama
             
+            self._configure_cuda_graphs()
             self.model = Llama(
                 model_path=str(model_path),
                 n_ctx=self.config.n_ctx,
@@ -80,35 +165,142 @@ class LocalLLM(BaseLLM):
                 verbose=False
             )
             
-            self._is_loaded = True
+            with self._pool_lock:
+                self._model_pool[key] = weakref.ref(self.model)
+            
+            self._prepare_rag_tokens()
+            self.is_loaded = True
             logger.info("Model loaded successfully")
             
             # Log model info
             logger.info(
-                f"Context window: {self.config.n_ctx}, "
-                f"Threads: {self.config.n_threads}, "
-                f"GPU layers: {self.config.n_gpu_layers}"
+                "Context window: %d, Threads: %d, GPU layers: %d",
+                self.config.n_ctx,
+                self.config.n_threads,
+                self.config.n_gpu_layers
             )
             
             return True
             
         except Exception as e:
             logger.error(f"Error loading model: {e}")
-            self._is_loaded = False
+            self.is_loaded = False
             return False
     
-    def unload(self) -> None:
-        """Unload model and free memory."""
+    def unload(self, park: bool = True) -> None:
+        """
+        Unload model and free memory.
+        
+        Args:
+            park: Keep the underlying Llama object alive for POOL_TTL_SECONDS
+                so that a load() with the same settings can reuse it (loading
+                a model with different settings releases it immediately).
+                Without parking, all parked models are released as well, e.g.
+                when switching to API mode or shutting down.
+        """
         if self.model is not None:
             logger.info("Unloading local model")
+            self._clear_kv_cache()
+            self.clear_corpus()
+            self._chunk_tok_cache.clear()
+            
+            key = self._pool_key(Path(self.config.local_model_path))
+            with self._pool_lock:
+                if LocalLLM._reaper is not None:
+                    LocalLLM._reaper.cancel()
+                    LocalLLM._reaper = None
+                
+                ref = self._model_pool.get(key)
+                if not park:
+                    self._parked_models.clear()
+                elif ref is not None and ref() is self.model:
+                    expires_at = time.monotonic() + self.POOL_TTL_SECONDS
+                    self._parked_models[key] = (self.model, expires_at)
+                
+                if self._parked_models:
+                    LocalLLM._reaper = threading.Timer(
+                        self.POOL_TTL_SECONDS, self._release_expired
+                    )
+                    LocalLLM._reaper.daemon = True
+                    LocalLLM._reaper.start()
+            
             del self.model
             self.model = None
-            self._is_loaded = False
+            self.is_loaded = False
             
             # Force garbage collection
             import gc
             gc.collect()
     
+    def _configure_cuda_graphs(self) -> None:
+        """
+        Enable or disable CUDA graph capture for the next context.
+        
+        llama.cpp's CUDA backend captures the per-token decode kernels into a
+        graph and replays it, which removes most of the kernel launch
+        overhead at batch size 1. It is on by default in CUDA builds and can
+        only be switched off through GGML_CUDA_DISABLE_GRAPHS, which is read
+        when the context is created. CPU-only loads (n_gpu_layers == 0) are
+        left untouched, and a value set in the user's environment is never
+        removed.
+        """
+        if self.config.n_gpu_layers <= 0:
+            return
+        
+        if not self.config.use_cuda_graphs:
+            if 'GGML_CUDA_DISABLE_GRAPHS' not in os.environ:
+                os.environ['GGML_CUDA_DISABLE_GRAPHS'] = '1'
+                LocalLLM._set_disable_graphs = True
+        elif LocalLLM._set_disable_graphs:
+            # Undo our own setting from an earlier load
+            os.environ.pop('GGML_CUDA_DISABLE_GRAPHS', None)
+            LocalLLM._set_disable_graphs = False
+        
+        logger.debug(
+            "CUDA graphs %s",
+            'disabled' if 'GGML_CUDA_DISABLE_GRAPHS' in os.environ else 'enabled'
+        )
+    
+    def _pool_key(self, model_path: Path) -> Tuple:
+        """Key identifying a Llama instance in the shared pool."""
+        return (
+            str(model_path.resolve()),
+            self.config.n_ctx,
+            self.config.n_threads,
+            self.config.n_gpu_layers,
+            self.config.use_cuda_graphs,
+        )
+    
+    @classmethod
+    def _purge_parked(cls, keep: Optional[Tuple] = None) -> None:
+        """
+        Release parked models that expired or use other settings.
+        
+        Must be called with _pool_lock held.
+        """
+        now = time.monotonic()
+        for key in list(cls._parked_models):
+            _, expires_at = cls._parked_models[key]
+            if key != keep or expires_at <= now:
+                del cls._parked_models[key]
+        
+        # Drop pool entries whose model has been garbage collected
+        for key in [k for k, ref in cls._model_pool.items() if ref() is None]:
+            del cls._model_pool[key]
+    
+    @classmethod
+    def _release_expired(cls) -> None:
+        """Release parked models whose TTL has passed."""
+        with cls._pool_lock:
+            LocalLLM._reaper = None
+            now = time.monotonic()
+            for key in list(cls._parked_models):
+                if cls._parked_models[key][1] <= now:
+                    del cls._parked_models[key]
+        
+        import gc
+        gc.collect()
+    
     def generate(
         self,
         prompt: str,
@@ -119,14 +311,14 @@ class LocalLLM(BaseLLM):
         Generate text from prompt.
         
         Args:
-            prompt: Input prompt
+            prompt: Input prompt (text or token ids)
             stream: Whether to stream (not used in non-streaming method)
             **kwargs: Additional generation parameters
             
         Returns:
             LLMResponse with generated text
         """
-        if not self._is_loaded:
+        if not self.is_loaded:
             return LLMResponse(
                 text="",
                 error="Model not loaded. Please load the model first."
@@ -138,29 +330,25 @@ class LocalLLM(BaseLLM):
                 'max_tokens': kwargs.get('max_tokens', self.config.max_tokens),
                 'temperature': kwargs.get('temperature', self.config.temperature),
                 'top_p': kwargs.get('top_p', self.config.top_p),
-                'echo': False,
                 'stop': kwargs.get('stop', []),
             }
             
-            logger.debug(f"Generating with params: {gen_params}")
+            logger.debug("Generating with params: %s", gen_params)
             
-            # Generate
-            output = self.model(
-                prompt,
-                **gen_params
-            )
+            tokens = self._tokenize_prompt(prompt)
+            stats = {}
             
-            # Extract response
-            text = output['choices'][0]['text']
+            # Generate
+            text = "".join(self._generate_pieces(tokens, stats, **gen_params))
             
             # Build usage stats
             usage = {
-                'prompt_tokens': output['usage']['prompt_tokens'],
-                'completion_tokens': output['usage']['completion_tokens'],
-                'total_tokens': output['usage']['total_tokens'],
+                'prompt_tokens': len(tokens),
+                'completion_tokens': stats['completion_tokens'],
+                'total_tokens': len(tokens) + stats['completion_tokens'],
             }
             
-            logger.debug(f"Generated {usage['completion_tokens']} tokens")
+            logger.debug("Generated %d tokens", usage['completion_tokens'])
             
             return LLMResponse(
                 text=text.strip(),
@@ -184,13 +372,13 @@ class LocalLLM(BaseLLM):
         Generate text with streaming.
         
         Args:
-            prompt: Input prompt
+            prompt: Input prompt (text or token ids)
             **kwargs: Additional generation parameters
             
         Yields:
             Text chunks as they are generated
         """
-        if not self._is_loaded:
+        if not self.is_loaded:
             logger.error("Model not loaded")
             yield "[Error: Model not loaded]"
             return
@@ -200,17 +388,14 @@ class LocalLLM(BaseLLM):
                 'max_tokens': kwargs.get('max_tokens', self.config.max_tokens),
                 'temperature': kwargs.get('temperature', self.config.temperature),
                 'top_p': kwargs.get('top_p', self.config.top_p),
-                'stream': True,
-                'echo': False,
                 'stop': kwargs.get('stop', []),
             }
             
             logger.debug("Starting streaming generation")
             
-            stream = self.model(prompt, **gen_params)
+            tokens = self._tokenize_prompt(prompt)
             
-            for output in stream:
-                chunk = output['choices'][0]['text']
+            for chunk in self._generate_pieces(tokens, {}, **gen_params):
                 if chunk:
                     yield chunk
             
@@ -220,6 +405,450 @@ class LocalLLM(BaseLLM):
             logger.error(f"Error in streaming generation: {e}")
             yield f"[Error: {str(e)}]"
     
+    def _tokenize_prompt(self, prompt) -> List[int]:
+        """Tokenize a text prompt; token id lists are passed through."""
+        if isinstance(prompt, str):
+            return self.model.tokenize(prompt.encode('utf-8'))
+        return list(prompt)
+    
+    def _generate_pieces(
+        self,
+        prompt_tokens: List[int],
+        stats: Dict[str, int],
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        stop: List[str]
+    ) -> Iterator[str]:
+        """
+        Run llama_cpp's token loop and yield decoded text.
+        
+        Uses Llama.generate (eval + sample per token) directly instead of the
+        OpenAI-style completion API, which builds a response dict per token.
+        Like the completion API, it reuses the KV cache for the longest prompt
+        prefix already evaluated in the model.
+        
+        Args:
+            prompt_tokens: Prompt token ids
+            stats: Dict receiving 'completion_tokens'
+            max_tokens: Maximum number of tokens to generate (<= 0: no limit)
+            temperature: Sampling temperature
+            top_p: Nucleus sampling threshold
+            stop: Stop sequences (not included in the output)
+            
+        Yields:
+            Decoded text pieces (may be empty while a character is incomplete)
+        """
+        n_ctx = self.config.n_ctx
+        if len(prompt_tokens) >= n_ctx:
+            raise ValueError(
+                f"Prompt has {len(prompt_tokens)} tokens, "
+                f"exceeding the context window ({n_ctx})"
+            )
+        
+        if max_tokens <= 0 or len(prompt_tokens) + max_tokens > n_ctx:
+            max_tokens = n_ctx - len(prompt_tokens)
+        
+        eos = self.model.token_eos()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        
+        # Text held back because it could be the start of a stop sequence
+        held = ""
+        hold = max((len(s) for s in stop), default=1) - 1
+        
+        stats['completion_tokens'] = 0
+        
+        for token in self.model.generate(prompt_tokens, temp=temperature, top_p=top_p, reset=True):
+            if token == eos:
+                break
+            
+            stats['completion_tokens'] += 1
+            held += decoder.decode(self.model.detokenize([token]))
+            
+            if stop:
+                positions = [held.find(s) for s in stop if s in held]
+                if positions:
+                    yield held[:min(positions)]
+                    return
+            
+            if len(held) > hold:
+                yield held[:len(held) - hold]
+                held = held[len(held) - hold:]
+            
+            if stats['completion_tokens'] >= max_tokens:
+                break
+        
+        yield held + decoder.decode(b"", final=True)
+    
+    def _answer_question(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch],
+        stream: bool = False
+    ) -> LLMResponse:
+        """
+        Answer a question using retrieved context (RAG).
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            stream: Whether to stream response
+            
+        Returns:
+            LLMResponse with answer
+        """
+        if not self.is_loaded:
+            return LLMResponse(
+                text="",
+                error="Model not loaded. Please load the model first."
+            )
+        
+        try:
+            tokens = self._build_answer_prompt(question, context_chunks)
+        except Exception as e:
+            logger.error(f"Error prefilling context: {e}")
+            return LLMResponse(
+                text="",
+                error=str(e)
+            )
+        
+        return self.generate(tokens, stream=stream)
+    
+    def _answer_question_stream(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> Iterator[str]:
+        """
+        Stream an answer using retrieved context (RAG).
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            
+        Yields:
+            Text chunks of the answer
+        """
+        if not self.is_loaded:
+            logger.error("Model not loaded")
+            yield "[Error: Model not loaded]"
+            return
+        
+        try:
+            tokens = self._build_answer_prompt(question, context_chunks)
+        except Exception as e:
+            logger.error(f"Error prefilling context: {e}")
+            yield f"[Error: {str(e)}]"
+            return
+        
+        yield from self.generate_stream(tokens)
+    
+    def _build_answer_prompt(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> List[int]:
+        """
+        Prefill the context of an answer and return the prompt token ids.
+        
+        If a corpus was preloaded (see preload_corpus) and the question still
+        fits the context window, the corpus state is restored and only the
+        question is prefilled; the retrieved chunks are not needed.
+        
+        Without a corpus or any context chunks, the question is sent as is.
+        Otherwise the prompt is prefilled segment by segment and the KV state
+        after each document is snapshotted, so a later question that starts
+        with the same documents only prefills what is new.
+        
+        The model state then holds the context, so generation only has to
+        prefill the question tail (llama_cpp reuses the matching prefix).
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved document chunks (dicts or ChunkBatch)
+            
+        Returns:
+            Prompt token ids
+        """
+        if self._corpus_state is not None:
+            tokens = self._tokenize_prompt(
+                self._corpus_text + self._build_question_segment(question)
+            )
+            
+            if len(tokens) + self.config.max_tokens <= self.config.n_ctx:
+                self.model.load_state(self._corpus_state)
+                return tokens
+            
+            logger.debug("Question does not fit next to preloaded corpus, using RAG")
+        
+        if not context_chunks:
+            return self._tokenize_prompt(question)
+        
+        segments, tail = self._build_rag_tokens(question, context_chunks)
+        tokens = self._prefill_cached(segments)
+        tokens += tail
+        return tokens
+    
+    def preload_corpus(self, documents: List[Dict[str, Any]]) -> bool:
+        """
+        Prefill a whole (small) corpus once for cache-augmented generation.
+        
+        After a successful preload, answer_question restores the corpus KV
+        state and only prefills the question, instead of building a RAG
+        prompt from retrieved chunks.
+        
+        Args:
+            documents: Documents with 'text' and 'metadata', like context chunks
+            
+        Returns:
+            True if the corpus was preloaded, False if it does not fit n_ctx
+        """
+        if not self.is_loaded:
+            logger.error("Model not loaded")
+            return False
+        
+        self.clear_corpus()
+        
+        text = "".join(self._build_context_segments(documents))
+        tokens = self._tokenize_prompt(text)
+        
+        if len(tokens) + self.config.max_tokens >= self.config.n_ctx:
+            logger.warning(
+                f"Corpus too large to preload ({len(tokens)} tokens, "
+                f"context window: {self.config.n_ctx})"
+            )
+            return False
+        
+        try:
+            self.model.reset()
+            self.model.eval(tokens)
+            self._corpus_state = self.model.save_state()
+            self._corpus_text = text
+        except Exception as e:
+            logger.error(f"Error preloading corpus: {e}")
+            self.clear_corpus()
+            return False
+        
+        logger.info("Preloaded %d documents (%d tokens)", len(documents), len(tokens))
+        return True
+    
+    def clear_corpus(self) -> None:
+        """Forget the preloaded corpus and go back to RAG answers."""
+        self._corpus_state = None
+        self._corpus_text = ""
+    
+    def _prepare_rag_tokens(self) -> None:
+        """Tokenize the static parts of the RAG prompt once per model."""
+        self._rag_prefix_tokens = self.model.tokenize(
+            RAG_PROMPT_HEADER.encode('utf-8'), add_bos=True
+        )
+        self._rag_question_tokens = self.model.tokenize(
+            RAG_QUESTION_PREFIX.encode('utf-8'), add_bos=False
+        )
+        self._rag_suffix_tokens = self.model.tokenize(
+            RAG_PROMPT_INSTRUCTIONS.encode('utf-8'), add_bos=False
+        )
+        self._chunk_tok_cache.clear()
+    
+    def _build_rag_tokens(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> Tuple[List[Tuple[bytes, List[int]]], List[int]]:
+        """
+        Tokenize the RAG prompt, split into segments for KV state reuse.
+        
+        Documents are cut off once the prompt would leave less than
+        max_tokens of the context window for the answer; the last document
+        that still fits partially is truncated at a token boundary.
+        
+        Args:
+            question: User's question
+            context_chunks: Retrieved chunks (dicts with 'text' and 'metadata', or ChunkBatch)
+            
+        Returns:
+            Tuple of (context segments as (hash, token ids) pairs,
+            token ids of the question and instructions)
+        """
+        chunks = context_chunks[:self.config.max_context_chunks]
+        tail = self._tokenize_question(question)
+        
+        budget = (
+            self.config.n_ctx - self.config.max_tokens
+            - len(self._rag_prefix_tokens) - len(tail)
+        )
+        
+        texts = [RAG_PROMPT_HEADER]
+        parts = [self._rag_prefix_tokens]
+        for i, segment in enumerate(self._build_context_segments(chunks)[1:]):
+            tokens = self._tokenize_segment(segment)
+            
+            if len(tokens) > budget:
+                if budget > 0:
+                    tokens = tokens[:budget]
+                    texts.append(
+                        self.model.detokenize(tokens).decode('utf-8', errors='ignore')
+                    )
+                    parts.append(tokens)
+                logger.debug(
+                    "Context budget exhausted, truncated at document %d of %d",
+                    i + 1, len(chunks)
+                )
+                break
+            
+            texts.append(segment)
+            parts.append(tokens)
+            budget -= len(tokens)
+        
+        texts.append(self._build_question_segment(question))
+        parts.append(tail)
+        
+        segments = [
+            (self._hash(text.encode('utf-8')), tokens)
+            for text, tokens in self._align_segments(texts, parts)
+        ]
+        return segments[:-1], segments[-1][1]
+    
+    def _align_segments(
+        self,
+        texts: List[str],
+        parts: List[List[int]]
+    ) -> List[Tuple[str, List[int]]]:
+        """
+        Split the tokens of a whole prompt at its segment boundaries.
+        
+        Segments tokenized on their own do not always add up to the tokens
+        of the whole prompt: SentencePiece tokenizers prefix each text with
+        a space, and BPE merges can span a boundary (e.g. "\n" + "\n\n").
+        The separate tokens are used when they match; otherwise the whole
+        prompt is split where a prefix of it tokenizes to a prefix of its
+        tokens, and a segment ending inside a token is merged into the next.
+        
+        Args:
+            texts: Consecutive prompt segments
+            parts: Token ids of each segment tokenized on its own
+            
+        Returns:
+            (text, token ids) per segment; the token ids add up to exactly
+            the tokens of "".join(texts)
+        """
+        full = self._tokenize_prompt("".join(texts))
+        
+        if [token for part in parts for token in part] == full:
+            return list(zip(texts, parts))
+        
+        segments = []
+        start = 0
+        prefix = ""
+        pending = ""
+        for text in texts[:-1]:
+            prefix += text
+            pending += text
+            head = self._tokenize_prompt(prefix)
+            if len(head) > start and full[:len(head)] == head:
+                segments.append((pending, full[start:len(head)]))
+                start = len(head)
+                pending = ""
+        
+        segments.append((pending + texts[-1], full[start:]))
+        return segments
+    
+    def _tokenize_segment(self, segment: str) -> List[int]:
+        """Tokenize a document segment, using the chunk token cache."""
+        data = segment.encode('utf-8')
+        digest = self._hash(data)
+        
+        tokens = self._chunk_tok_cache.get(digest)
+        if tokens is None:
+            tokens = self.model.tokenize(data, add_bos=False)
+            self._chunk_tok_cache[digest] = tokens
+            if len(self._chunk_tok_cache) > self.CHUNK_TOKEN_CACHE_SIZE:
+                self._chunk_tok_cache.popitem(last=False)
+        else:
+            self._chunk_tok_cache.move_to_end(digest)
+        
+        return tokens
+    
+    def _tokenize_question(self, question: str) -> List[int]:
+        """Tokenize the question tail of the RAG prompt."""
+        return (
+            self._rag_question_tokens
+            + self.model.tokenize(question.encode('utf-8'), add_bos=False)
+            + self._rag_suffix_tokens
+        )
+    
+    def _prefill_cached(self, segments: List[Tuple[bytes, List[int]]]) -> List[int]:
+        """
+        Evaluate prompt segments, restoring cached KV state where possible.
+        
+        A segment's cache key chains the hashes of all preceding segments,
+        since its KV entries depend on every token before it.
+        
+        Args:
+            segments: Consecutive prompt segments as (hash, token ids) pairs
+            
+        Returns:
+            Token ids of all segments (already evaluated in the model)
+        """
+        keys = []
+        key = b""
+        for digest, _ in segments:
+            key = self._hash(key + digest)
+            keys.append(key)
+        
+        # Restore the longest cached prefix
+        start = 0
+        for i in range(len(keys) - 1, -1, -1):
+            state = self._kv_cache.get(keys[i])
+            if state is not None:
+                self._kv_cache.move_to_end(keys[i])
+                self.model.load_state(state)
+                start = i + 1
+                break
+        else:
+            self.model.reset()
+        
+        logger.debug("KV cache: reused %d/%d prompt segments", start, len(segments))
+        
+        # Prefill the rest, snapshotting after each segment
+        for i in range(start, len(segments)):
+            self.model.eval(segments[i][1])
+            self._store_kv_state(keys[i], self.model.save_state())
+        
+        tokens = []
+        for _, segment_tokens in segments:
+            tokens += segment_tokens
+        return tokens
+    
+    def _store_kv_state(self, key: bytes, state: Any) -> None:
+        """Add a KV state snapshot, evicting least recently used ones past the budget."""
+        budget = self.config.kv_cache_mb * 1024 * 1024
+        size = self._state_nbytes(state)
+        
+        if size > budget:
+            return
+        
+        self._kv_cache[key] = state
+        self._kv_cache_bytes += size
+        
+        while self._kv_cache_bytes > budget:
+            _, old_state = self._kv_cache.popitem(last=False)
+            self._kv_cache_bytes -= self._state_nbytes(old_state)
+    
+    def _clear_kv_cache(self) -> None:
+        """Drop all cached KV states."""
+        self._kv_cache.clear()
+        self._kv_cache_bytes = 0
+    
+    @staticmethod
+    def _state_nbytes(state: Any) -> int:
+        """Approximate memory held by a llama_cpp state snapshot."""
+        size = state.llama_state_size
+        scores = getattr(state, 'scores', None)
+        if scores is not None:
+            size += scores.nbytes
+        return size
+    
     def get_info(self) -> Dict[str, Any]:
         """Get model information."""
         info = super().get_info()
@@ -231,6 +860,9 @@ class LocalLLM(BaseLLM):
         })
         return info
     
+    # First bytes of every GGUF file
+    GGUF_MAGIC = b'GGUF'
+    
     @staticmethod
     def is_gguf_file(path: str) -> bool:
         """
@@ -240,10 +872,13 @@ class LocalLLM(BaseLLM):
             path: Path to file
             
         Returns:
-            True if file exists and has .gguf extension
+            True if file exists and starts with the GGUF magic bytes
         """
-        p = Path(path)
-        return p.exists() and p.suffix.lower() == '.gguf'
+        try:
+            with open(path, 'rb') as f:
+                return f.read(4) == LocalLLM.GGUF_MAGIC
+        except OSError:
+            return False
     
     @staticmethod
     def estimate_memory_usage(model_path: str) -> Optional[int]:
@@ -257,9 +892,283 @@ class LocalLLM(BaseLLM):
             Estimated memory in MB, or None if cannot estimate
         """
         try:
-            size_bytes = Path(model_path).stat().st_size
+            size_bytes = os.stat(model_path).st_size
             # Rough estimate: model file size + 20% overhead
             size_mb = int(size_bytes / (1024 * 1024) * 1.2)
             return size_mb
-        except Exception:
-            return None
\ No newline at end of file
+        except OSError:
+            return None
+
+
+class BatchingLocalLLM(LocalLLM):
+    """
+    LocalLLM that funnels concurrent requests through a single worker.
+    
+    A llama.cpp context can only run one sequence at a time, so concurrent
+    callers are queued and served by one worker thread. Requests arriving
+    within max_wait_ms of each other form a batch (up to max_batch), and
+    identical greedy (temperature 0) requests in a batch are generated once
+    and fanned out to all callers. Sampled requests always run separately so
+    each caller gets its own completion.
+    """
+    
+    def __init__(
+        self,
+        config: LLMConfig,
+        max_batch: int = 8,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize batching local LLM.
+        
+        Args:
+            config: LLM configuration with local_model_path
+            max_batch: Maximum number of requests collected per batch
+            max_wait_ms: How long to wait for more requests after the first
+        """
+        super().__init__(config)
+        
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        
+        self._requests = queue.Queue()  # (key, fn, future) or None to stop
+        self._worker: Optional[threading.Thread] = None
+    
+    def load(self) -> bool:
+        """Load the model and start the worker thread."""
+        if not super().load():
+            return False
+        
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._worker_loop,
+                name="BatchingLocalLLM",
+                daemon=True
+            )
+            self._worker.start()
+        
+        return True
+    
+    def unload(self, park: bool = True) -> None:
+        """Stop the worker thread and unload the model (see LocalLLM.unload)."""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+        
+        super().unload(park=park)
+    
+    def submit(self, prompt: str, **kwargs) -> Future:
+        """
+        Queue a generation request.
+        
+        Args:
+            prompt: Input prompt (text or token ids)
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            Future resolving to an LLMResponse
+        """
+        key = None
+        if kwargs.get('temperature', self.config.temperature) == 0:
+            prompt_key = prompt if isinstance(prompt, str) else tuple(prompt)
+            key = ('generate', prompt_key, repr(sorted(kwargs.items())))
+        return self._submit(key, lambda: LocalLLM.generate(self, prompt, **kwargs))
+    
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        """
+        Generate text without blocking the event loop.
+        
+        The request is queued for the worker like any other, so concurrent
+        coroutines can share a batch.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            LLMResponse with generated text
+        """
+        if self._worker is None:
+            return await super().agenerate(prompt, **kwargs)
+        
+        return await asyncio.wrap_future(self.submit(prompt, **kwargs))
+    
+    async def generate_async(self, prompt: str, **kwargs) -> LLMResponse:
+        """Alias of agenerate, kept for existing callers."""
+        return await self.agenerate(prompt, **kwargs)
+    
+    def generate(
+        self,
+        prompt: str,
+        stream: bool = False,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate text on the worker thread (see LocalLLM.generate)."""
+        if self._worker is None or self._on_worker():
+            return super().generate(prompt, stream=stream, **kwargs)
+        
+        return self.submit(prompt, **kwargs).result()
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream text generated on the worker thread (see LocalLLM.generate_stream)."""
+        if self._worker is None or self._on_worker():
+            yield from super().generate_stream(prompt, **kwargs)
+            return
+        
+        yield from self._stream_on_worker(
+            lambda: LocalLLM.generate_stream(self, prompt, **kwargs)
+        )
+    
+    def batch_generate(
+        self,
+        prompts: List[str],
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate text for several prompts.
+        
+        All prompts are queued at once so the worker picks them up as a
+        single batch (duplicates are generated once at temperature 0).
+        
+        Args:
+            prompts: Input prompts
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            One LLMResponse per prompt, in the same order
+        """
+        if self._worker is None or self._on_worker():
+            return super().batch_generate(prompts, **kwargs)
+        
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        return [future.result() for future in futures]
+    
+    def _answer_question(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch],
+        stream: bool = False
+    ) -> LLMResponse:
+        """Answer on the worker thread, so prefill and generation stay together."""
+        if self._worker is None or self._on_worker():
+            return super()._answer_question(question, context_chunks, stream)
+        
+        key = None
+        if self.config.temperature == 0:
+            key = ('answer', question, self._context_key(context_chunks))
+        return self._submit(
+            key,
+            lambda: LocalLLM._answer_question(self, question, context_chunks, stream)
+        ).result()
+    
+    def _answer_question_stream(
+        self,
+        question: str,
+        context_chunks: Union[List[Dict[str, Any]], ChunkBatch]
+    ) -> Iterator[str]:
+        """Stream an answer prefilled and generated on the worker thread."""
+        if self._worker is None or self._on_worker():
+            yield from super()._answer_question_stream(question, context_chunks)
+            return
+        
+        yield from self._stream_on_worker(
+            lambda: LocalLLM._answer_question_stream(self, question, context_chunks)
+        )
+    
+    def _stream_on_worker(self, produce: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Run a text generator on the worker thread and relay its chunks."""
+        chunks = queue.Queue()
+        
+        def run():
+            try:
+                for chunk in produce():
+                    chunks.put(chunk)
+            finally:
+                chunks.put(None)
+        
+        self._submit(None, run)
+        
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+    
+    def _on_worker(self) -> bool:
+        """Check if running on the worker thread."""
+        return threading.current_thread() is self._worker
+    
+    def _submit(self, key: Optional[Tuple], fn: Callable[[], Any]) -> Future:
+        """Queue a callable; requests with equal non-None keys may be merged."""
+        future = Future()
+        self._requests.put((key, fn, future))
+        return future
+    
+    def _worker_loop(self) -> None:
+        """Collect batches of requests and run them on the model."""
+        stopping = False
+        
+        while not stopping:
+            item = self._requests.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._run_batch(batch)
+        
+        # Fail anything still queued
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[2].set_running_or_notify_cancel():
+                item[2].set_exception(RuntimeError("Model unloaded"))
+    
+    def _run_batch(self, batch: List[Tuple[Optional[Tuple], Callable[[], Any], Future]]) -> None:
+        """Run a batch, computing each distinct request once."""
+        if len(batch) > 1:
+            logger.debug("Running batch of %d requests", len(batch))
+        
+        done = {}  # {key: (result, exception)}
+        
+        for key, fn, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            if key is not None and key in done:
+                result, error = done[key]
+            else:
+                result, error = None, None
+                try:
+                    result = fn()
+                except Exception as e:
+                    error = e
+                if key is not None:
+                    done[key] = (result, error)
+            
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
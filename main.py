@@ -6,28 +6,17 @@ with optional AI-powered Q&A capabilities.
 """
 
 import sys
+import hashlib
 import logging
+import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
-from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import QThread, Signal
-
-# Import core modules
-from core import (
-    EmbeddingGenerator,
-    VectorStore,
-    FileLoader,
-    TextChunker,
-    DocumentIndexer,
-    SearchEngine
-)
-
-# Import LLM modules
-from llm import create_llm, LLMConfig
-
-# Import GUI modules
-from gui import MainWindow
+try:
+    import xxhash
+except ImportError:  # Optional, falls back to hashlib.blake2b
+    xxhash = None
 
 # Import utilities
 from utils import FileWatcher, setup_logger, configure_third_party_loggers
@@ -35,6 +24,21 @@ from utils import FileWatcher, setup_logger, configure_third_party_loggers
 # Import configuration
 from config import get_config
 
+# PySide6, core (torch, chromadb), llm and gui take seconds to import, so
+# they are imported where first needed
+if TYPE_CHECKING:
+    from core import (
+        EmbeddingGenerator,
+        VectorStore,
+        FileLoader,
+        TextChunker,
+        DocumentIndexer,
+        IndexQueue,
+        IndexJournal,
+        SearchEngine
+    )
+    from gui import IndexerWorker, MainWindow
+
 
 class ApplicationController:
     """
@@ -47,6 +51,9 @@ class ApplicationController:
     - File watcher
     """
     
+    # How long shutdown waits for background indexing to stop
+    INDEXER_STOP_TIMEOUT_MS = 30000
+    
     def __init__(self, config_file: str = 'config.json'):
         """
         Initialize application controller.
@@ -78,10 +85,27 @@ class ApplicationController:
         self.file_loader: Optional[FileLoader] = None
         self.chunker: Optional[TextChunker] = None
         self.indexer: Optional[DocumentIndexer] = None
+        self.index_queue: Optional[IndexQueue] = None
+        self.indexer_worker: Optional[IndexerWorker] = None
         self.search_engine: Optional[SearchEngine] = None
         self.llm: Optional[any] = None
         self.file_watcher: Optional[FileWatcher] = None
         
+        # Fingerprint of watched files (see _file_fingerprint) as of their
+        # last successful indexing, fingerprints of files waiting in the
+        # index queue, and the indexed fingerprints kept across restarts.
+        # Used by the watcher, index queue and GUI threads.
+        self._fingerprints: Dict[str, Tuple[int, int, int]] = {}
+        self._queued_fingerprints: Dict[str, Tuple[int, int, int]] = {}
+        self._fingerprints_lock = threading.Lock()
+        self.index_journal: Optional[IndexJournal] = None
+        
+        # Deleted files waiting to be removed from the index in one batch
+        self._pending_deletes: Set[str] = set()
+        self._deletes_lock = threading.Lock()
+        self._deletes_timer: Optional[threading.Timer] = None
+        self._flush_lock = threading.Lock()  # one flush at a time
+        
         # GUI
         self.main_window: Optional[MainWindow] = None
         
@@ -89,6 +113,17 @@ class ApplicationController:
     
     def _initialize_components(self):
         """Initialize all components."""
+        from core import (
+            EmbeddingGenerator,
+            VectorStore,
+            FileLoader,
+            TextChunker,
+            DocumentIndexer,
+            IndexQueue,
+            IndexJournal,
+            SearchEngine
+        )
+        
         try:
             self.logger.info("Initializing core components...")
             
@@ -98,6 +133,23 @@ class ApplicationController:
                 device=self.config['device']
             )
             
+            if self.config['quantize_embeddings']:
+                self.embedder.quantize()
+            
+            if self.config['compile_embeddings']:
+                self.embedder.compile(
+                    cache_dir=str(Path(self.config['log_dir']).parent / 'compile_cache')
+                )
+            
+            if self.config['warmup_embeddings']:
+                # Load the model while the GUI starts rather than on the first search
+                threading.Thread(
+                    target=self.embedder.warmup,
+                    args=(self.config['batch_size'],),
+                    name="EmbedderWarmup",
+                    daemon=True
+                ).start()
+            
             # Vector store
             self.vector_store = VectorStore(
                 persist_directory=self.config['db_path'],
@@ -125,6 +177,13 @@ class ApplicationController:
                 batch_size=self.config['batch_size']
             )
             
+            # Batches re-index requests from the file watcher
+            self.index_journal = IndexJournal(
+                str(Path(self.config['db_path']) / 'index_journal.bin')
+            )
+            self.index_queue = IndexQueue(self.indexer, on_indexed=self._on_files_indexed)
+            self.index_queue.start()
+            
             # Search engine
             self.search_engine = SearchEngine(
                 embedder=self.embedder,
@@ -149,6 +208,8 @@ class ApplicationController:
     
     def _initialize_llm(self):
         """Initialize LLM based on configuration."""
+        from llm import create_llm, LLMConfig
+        
         llm_mode = self.config['llm_mode']
         
         if llm_mode == 'none':
@@ -164,6 +225,8 @@ class ApplicationController:
                 n_ctx=self.config.get('n_ctx', 4096),
                 n_threads=self.config.get('n_threads', 4),
                 n_gpu_layers=self.config.get('n_gpu_layers', 0),
+                kv_cache_mb=self.config.get('kv_cache_mb', 2048),
+                use_cuda_graphs=self.config.get('use_cuda_graphs', True),
                 api_provider=self.config.get('api_provider'),
                 api_key=self.config.get('api_key'),
                 api_model=self.config.get('api_model'),
@@ -171,12 +234,16 @@ class ApplicationController:
                 temperature=self.config.get('temperature', 0.7),
                 max_tokens=self.config.get('max_tokens', 1000),
                 top_p=self.config.get('top_p', 0.9),
-                max_context_chunks=self.config.get('max_context_chunks', 5)
+                n_parallel=self.config.get('n_parallel', 4),
+                max_context_chunks=self.config.get('max_context_chunks', 5),
+                semantic_cache_size=self.config.get('semantic_cache_size', 128),
+                semantic_cache_threshold=self.config.get('semantic_cache_threshold', 0.95)
             )
             
             self.llm = create_llm(llm_config)
             
             if self.llm.load():
+                self.llm.set_embedder(self.embedder)
                 self.logger.info("LLM initialized successfully")
             else:
                 self.logger.error("Failed to load LLM")
@@ -186,8 +253,24 @@ class ApplicationController:
             self.logger.exception(f"Error initializing LLM: {e}")
             self.llm = None
     
+    def _unload_llm(self, park: bool):
+        """
+        Unload the LLM.
+        
+        Args:
+            park: Let a local model be reused by a reload shortly after
+        """
+        from llm import LocalLLM
+        
+        if isinstance(self.llm, LocalLLM):
+            self.llm.unload(park=park)
+        else:
+            self.llm.unload()
+    
     def _initialize_file_watcher(self):
         """Initialize file system watcher."""
+        from core import FileLoader
+        
         try:
             folder_path = self.config['folder_path']
             
@@ -204,7 +287,9 @@ class ApplicationController:
                 on_modified=self._on_file_modified,
                 on_deleted=self._on_file_deleted,
                 recursive=self.config['recursive'],
-                debounce_seconds=self.config['debounce_seconds']
+                debounce_seconds=self.config['debounce_seconds'],
+                force_polling=self.config['watch_force_polling'],
+                polling_interval=self.config['watch_polling_interval']
             )
             
             self.file_watcher.start()
@@ -216,32 +301,127 @@ class ApplicationController:
     
     def _on_file_created(self, file_path: str):
         """Handle file creation."""
-        self.logger.info(f"File created, indexing: {file_path}")
-        try:
-            self.indexer.index_file(file_path)
-        except Exception as e:
-            self.logger.error(f"Error indexing new file: {e}")
+        with self._deletes_lock:
+            self._pending_deletes.discard(file_path)
+        
+        fingerprint = self._file_fingerprint(file_path)
+        if fingerprint is not None and self.index_journal.get(file_path) == fingerprint:
+            # Already indexed with this content, e.g. by a run that was interrupted
+            self.logger.debug(f"File already indexed, skipping: {file_path}")
+            return
+        
+        self._queue_for_indexing(file_path, fingerprint)
+        self.logger.info(f"File created, queued for indexing: {file_path}")
+        self.index_queue.put(file_path)
     
     def _on_file_modified(self, file_path: str):
         """Handle file modification."""
-        self.logger.info(f"File modified, re-indexing: {file_path}")
+        fingerprint = self._file_fingerprint(file_path)
+        
+        with self._fingerprints_lock:
+            known = self._fingerprints.get(file_path)
+        known = known or self.index_journal.get(file_path)
+        
+        if fingerprint is not None and known == fingerprint:
+            self.logger.debug(f"File unchanged, skipping re-index: {file_path}")
+            return
+        
+        self._queue_for_indexing(file_path, fingerprint)
+        self.logger.info(f"File modified, queued for re-indexing: {file_path}")
+    
+    def _queue_for_indexing(
+        self,
+        file_path: str,
+        fingerprint: Optional[Tuple[int, int, int]]
+    ):
+        """
+        Queue a file for indexing.
+        
+        The fingerprint is only taken as indexed once the index queue
+        reports success, so a failed attempt is retried on the next event.
+        """
+        with self._fingerprints_lock:
+            if fingerprint is None:
+                self._queued_fingerprints.pop(file_path, None)
+            else:
+                self._queued_fingerprints[file_path] = fingerprint
+        self.index_queue.put(file_path)
+    
+    def _on_files_indexed(self, file_paths: List[str]):
+        """Record the fingerprints of files indexed by the index queue."""
+        for file_path in file_paths:
+            with self._fingerprints_lock:
+                fingerprint = self._queued_fingerprints.pop(file_path, None)
+                if fingerprint is not None:
+                    self._fingerprints[file_path] = fingerprint
+            if fingerprint is not None:
+                self.index_journal.put(file_path, fingerprint)
+    
+    @staticmethod
+    def _file_fingerprint(file_path: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Cheap fingerprint of a file: mtime, size and a hash of its first 64 KiB.
+        
+        Catches saves that fire modification events without changing the
+        file (touch, attribute changes, repeated events of one save).
+        
+        Returns:
+            (mtime_ns, size, head_hash), or None if the file cannot be read
+        """
         try:
-            self.indexer.index_file(file_path)
-        except Exception as e:
-            self.logger.error(f"Error re-indexing modified file: {e}")
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                head = f.read(65536)
+        except OSError:
+            return None
+        
+        if xxhash is not None:
+            head_hash = xxhash.xxh3_64_intdigest(head)
+        else:
+            head_hash = int.from_bytes(hashlib.blake2b(head, digest_size=8).digest(), 'little')
+        
+        return stat.st_mtime_ns, stat.st_size, head_hash
     
     def _on_file_deleted(self, file_path: str):
         """Handle file deletion."""
         self.logger.info(f"File deleted, removing from index: {file_path}")
-        try:
-            results = self.vector_store.get_by_filter({'file_path': file_path})
-            if results['ids']:
-                self.vector_store.delete_documents(results['ids'])
-        except Exception as e:
-            self.logger.error(f"Error removing deleted file from index: {e}")
+        with self._fingerprints_lock:
+            self._fingerprints.pop(file_path, None)
+            self._queued_fingerprints.pop(file_path, None)
+        self.index_journal.discard(file_path)
+        
+        # Deleting a folder fires one event per file; remove them together
+        with self._deletes_lock:
+            self._pending_deletes.add(file_path)
+            
+            if self._deletes_timer is None:
+                self._deletes_timer = threading.Timer(0.5, self._flush_deletes)
+                self._deletes_timer.daemon = True
+                self._deletes_timer.start()
+    
+    def _flush_deletes(self):
+        """Remove all pending deleted files from the index."""
+        with self._flush_lock:
+            with self._deletes_lock:
+                file_paths = list(self._pending_deletes)
+                self._pending_deletes.clear()
+                self._deletes_timer = None
+            
+            if not file_paths:
+                return
+            
+            try:
+                results = self.vector_store.get_by_filter({'file_path': {'$in': file_paths}})
+                if results['ids']:
+                    self.vector_store.delete_documents(results['ids'])
+            except Exception as e:
+                self.logger.error(f"Error removing deleted files from index: {e}")
     
     def run(self):
         """Run the application."""
+        from PySide6.QtWidgets import QApplication
+        from gui import MainWindow
+        
         try:
             # Create Qt application
             app = QApplication(sys.argv)
@@ -286,6 +466,8 @@ class ApplicationController:
     
     def _check_initial_indexing(self):
         """Check if initial indexing is needed."""
+        from PySide6.QtWidgets import QMessageBox
+        
         doc_count = self.vector_store.count()
         folder_path = self.config['folder_path']
         
@@ -303,37 +485,51 @@ class ApplicationController:
     
     def _start_indexing(self, folder_path: str):
         """Start indexing in background."""
+        from gui import IndexerWorker
+        
+        if self.indexer_worker is not None and self.indexer_worker.isRunning():
+            self.logger.warning("Indexing already in progress")
+            return
+        
         self.logger.info(f"Starting indexing of: {folder_path}")
         
-        def progress_callback(current, total, filename):
-            if self.main_window:
-                self.main_window.set_indexing_progress(current, total, filename)
+        self.indexer_worker = IndexerWorker(
+            indexer=self.indexer,
+            folder_path=folder_path,
+            recursive=self.config['recursive'],
+            workers=self.config['index_workers']
+        )
         
-        # Run in thread (simplified - in production, use QThread properly)
-        try:
-            stats = self.indexer.index_directory(
-                directory=folder_path,
-                recursive=self.config['recursive'],
-                progress_callback=progress_callback
+        if self.main_window:
+            self.indexer_worker.progress.connect(self.main_window.set_indexing_progress)
+        self.indexer_worker.indexing_complete.connect(self._on_indexing_complete)
+        self.indexer_worker.error_occurred.connect(self._on_indexing_error)
+        
+        self.indexer_worker.start()
+    
+    def _on_indexing_complete(self, stats: dict):
+        """Handle completion of background indexing."""
+        if self.main_window:
+            self.main_window.show_message(
+                f"Indexing complete: {stats['indexed_files']} files indexed "
+                f"({stats['total_chunks']} chunks) in {stats['duration']:.1f}s",
+                5000
             )
+        
+        self.logger.info(f"Indexing complete: {stats}")
+    
+    def _on_indexing_error(self, error: str):
+        """Handle a failed background indexing run."""
+        self.logger.error(f"Error during indexing: {error}")
+        
+        if self.main_window:
+            from PySide6.QtWidgets import QMessageBox
             
-            if self.main_window:
-                self.main_window.show_message(
-                    f"Indexing complete: {stats['indexed_files']} files indexed "
-                    f"({stats['total_chunks']} chunks) in {stats['duration']:.1f}s",
-                    5000
-                )
-            
-            self.logger.info(f"Indexing complete: {stats}")
-            
-        except Exception as e:
-            self.logger.exception(f"Error during indexing: {e}")
-            if self.main_window:
-                QMessageBox.critical(
-                    self.main_window,
-                    "Indexing Error",
-                    f"An error occurred during indexing:\n{str(e)}"
-                )
+            QMessageBox.critical(
+                self.main_window,
+                "Indexing Error",
+                f"An error occurred during indexing:\n{error}"
+            )
     
     def _on_settings_changed(self, new_config: dict):
         """Handle settings changes."""
@@ -355,7 +551,8 @@ class ApplicationController:
         # Reinitialize LLM if mode changed
         if self.config['llm_mode'] != new_config.get('llm_mode'):
             if self.llm:
-                self.llm.unload()
+                # Keep a local model around only if local mode is still used
+                self._unload_llm(park=self.config['llm_mode'] == 'local')
             self._initialize_llm()
             
             if self.main_window:
@@ -390,6 +587,10 @@ class ApplicationController:
         self.logger.warning("Resetting database...")
         try:
             self.vector_store.reset()
+            with self._fingerprints_lock:
+                self._fingerprints.clear()
+                self._queued_fingerprints.clear()
+            self.index_journal.clear()
             self.logger.info("Database reset complete")
             
             if self.main_window:
@@ -402,13 +603,34 @@ class ApplicationController:
         """Clean up resources."""
         self.logger.info("Cleaning up resources...")
         
+        # Stop background indexing after the file(s) in progress
+        if self.indexer_worker is not None:
+            self.indexer_worker.requestInterruption()
+            if not self.indexer_worker.wait(self.INDEXER_STOP_TIMEOUT_MS):
+                self.logger.warning("Background indexing did not stop in time")
+        
         # Stop file watcher
         if self.file_watcher:
             self.file_watcher.stop()
         
+        # Finish queued indexing
+        if self.index_queue:
+            self.index_queue.stop()
+        
+        # Apply pending deletions; the final flush waits for one the timer
+        # may already have started, so neither outlives the store
+        with self._deletes_lock:
+            if self._deletes_timer is not None:
+                self._deletes_timer.cancel()
+                self._deletes_timer = None
+        self._flush_deletes()
+        
+        if self.index_journal:
+            self.index_journal.close()
+        
         # Unload LLM
         if self.llm:
-            self.llm.unload()
+            self._unload_llm(park=False)
         
         # Unload embedder
         if self.embedder:
@@ -2,11 +2,17 @@
 File system watcher for automatic re-indexing.
 """
 
+import heapq
 import logging
+import os
+import queue
+import sys
+import threading
 import time
 from pathlib import Path
-from typing import Callable, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import (
     FileSystemEventHandler,
     FileCreatedEvent,
@@ -17,6 +23,12 @@ from watchdog.events import (
 
 logger = logging.getLogger(__name__)
 
+# Mount types whose change notifications are unreliable or missing
+NETWORK_FS_TYPES = frozenset({
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'sshfs', '9p', 'afs',
+    'davfs', 'fuse.rclone',
+})
+
 
 class DocumentFileHandler(FileSystemEventHandler):
     """
@@ -27,8 +39,16 @@ class DocumentFileHandler(FileSystemEventHandler):
     - File modification
     - File deletion
     - File moves
+    
+    The watchdog observer thread only queues events. A worker thread
+    debounces them per file on the trailing edge (a callback fires once,
+    debounce_seconds after the last event for that file) and runs the
+    callbacks, so slow callbacks never hold up the observer.
     """
     
+    # Max queued events taken per wake-up of the worker
+    DRAIN_BATCH = 1024
+    
     def __init__(
         self,
         supported_extensions: Set[str],
@@ -45,145 +65,201 @@ class DocumentFileHandler(FileSystemEventHandler):
             on_created: Callback for file creation (file_path)
             on_modified: Callback for file modification (file_path)
             on_deleted: Callback for file deletion (file_path)
-            debounce_seconds: Time to wait before triggering callback (prevents duplicate events)
+            debounce_seconds: Quiet time after the last event before triggering callback
         """
         super().__init__()
         
         self.supported_extensions = {ext.lower() for ext in supported_extensions}
+        self._exts = frozenset(ext.lstrip('.').lower() for ext in supported_extensions)
         self.on_created_callback = on_created
         self.on_modified_callback = on_modified
         self.on_deleted_callback = on_deleted
         self.debounce_seconds = debounce_seconds
         
-        # Debouncing: track recent events to avoid duplicates
-        self.recent_events = {}  # {file_path: (event_type, timestamp)}
+        # Events handed over by the observer thread: (event_type, file_path), or None to stop
+        self._events = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False  # Stop requested, worker may still be running
+        
+        # Debouncing (owned by the worker): latest pending event per file, and
+        # a heap of deadlines. Heap entries not matching _pending are stale.
+        self._pending: Dict[str, Tuple[str, float]] = {}  # {file_path: (event_type, fire_time)}
+        self._deadlines: List[Tuple[float, str]] = []
         
         logger.info(f"File handler initialized for extensions: {supported_extensions}")
     
     def _is_supported(self, path: str) -> bool:
         """Check if file extension is supported."""
-        return Path(path).suffix.lower() in self.supported_extensions
+        # Without a '.' rpartition yields '', which is never in _exts
+        return path.rpartition('.')[2].lower() in self._exts
     
-    def _should_process(self, path: str, event_type: str) -> bool:
-        """
-        Check if event should be processed (debouncing).
-        
-        Args:
-            path: File path
-            event_type: Event type ('created', 'modified', 'deleted')
-            
-        Returns:
-            True if event should be processed
-        """
-        now = time.time()
-        
-        if path in self.recent_events:
-            last_type, last_time = self.recent_events[path]
-            
-            # If same event type within debounce period, skip
-            if last_type == event_type and (now - last_time) < self.debounce_seconds:
-                logger.debug(f"Debouncing {event_type} event for {path}")
-                return False
-        
-        # Update recent events
-        self.recent_events[path] = (event_type, now)
-        
-        # Clean up old entries (older than debounce period)
-        cutoff = now - self.debounce_seconds * 2
-        self.recent_events = {
-            p: (t, ts) for p, (t, ts) in self.recent_events.items()
-            if ts > cutoff
-        }
-        
-        return True
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._worker is not None:
+            if not self._stopping:
+                return
+            # An earlier stop() timed out: let that worker finish first, so
+            # two workers never take events from the same queue
+            if self._worker is not threading.current_thread():
+                self._worker.join()
+        
+        self._stopping = False
+        self._worker = threading.Thread(
+            target=self._drain,
+            name="FileWatcherWorker",
+            daemon=True
+        )
+        self._worker.start()
     
-    def on_created(self, event: FileCreatedEvent):
-        """Handle file creation."""
-        if event.is_directory:
+    def stop(self) -> None:
+        """Stop the worker thread, firing pending events right away."""
+        if self._worker is None:
             return
         
-        path = event.src_path
+        if not self._stopping:
+            self._stopping = True
+            self._events.put(None)
         
-        if not self._is_supported(path):
+        if self._worker is threading.current_thread():
             return
         
-        if not self._should_process(path, 'created'):
+        self._worker.join(timeout=5)
+        if self._worker.is_alive():
+            logger.warning("File watcher worker is still firing pending events")
             return
         
-        logger.info(f"File created: {path}")
-        
-        if self.on_created_callback:
+        self._worker = None
+    
+    def _drain(self) -> None:
+        """Worker loop: debounce queued events and fire callbacks when due."""
+        while True:
+            timeout = None
+            if self._deadlines:
+                timeout = max(0.0, self._deadlines[0][0] - time.monotonic())
+            
+            # Block for the first event, then take whatever else is queued
+            items = []
+            try:
+                items.append(self._events.get(timeout=timeout))
+                while len(items) < self.DRAIN_BATCH:
+                    items.append(self._events.get_nowait())
+            except queue.Empty:
+                pass
+            
+            stopping = None in items
+            if stopping:
+                items = [item for item in items if item is not None]
+            
+            if items:
+                fire_time = time.monotonic() + self.debounce_seconds
+                for event_type, path in items:
+                    self._schedule(event_type, path, fire_time)
+            
+            if stopping:
+                break
+            
             try:
-                self.on_created_callback(path)
+                self._fire_due()
             except Exception as e:
-                logger.error(f"Error in on_created callback: {e}")
-    
-    def on_modified(self, event: FileModifiedEvent):
-        """Handle file modification."""
-        if event.is_directory:
-            return
+                # Events still due are fired on the next pass
+                logger.error(f"Error in file event callback: {e}")
         
-        path = event.src_path
+        self._fire_pending()
+    
+    def _schedule(self, event_type: str, path: str, fire_time: float) -> None:
+        """
+        Schedule the callback for a file event (debouncing).
         
-        if not self._is_supported(path):
-            return
+        Every event pushes the file's deadline back to fire_time, so a burst
+        of events triggers a single callback. The heap holds one entry per
+        pending file; a moved deadline is re-pushed when the old one expires.
         
-        if not self._should_process(path, 'modified'):
-            return
+        Args:
+            event_type: Event type ('created', 'modified', 'deleted')
+            path: File path
+            fire_time: New deadline (time.monotonic() based)
+        """
+        pending = self._pending.get(path)
         
-        logger.info(f"File modified: {path}")
+        if pending is None:
+            heapq.heappush(self._deadlines, (fire_time, path))
+        elif pending[0] == 'created' and event_type == 'modified':
+            # A file created and then written to is still new to the index
+            event_type = 'created'
         
-        if self.on_modified_callback:
-            try:
-                self.on_modified_callback(path)
-            except Exception as e:
-                logger.error(f"Error in on_modified callback: {e}")
+        self._pending[path] = (event_type, fire_time)
     
-    def on_deleted(self, event: FileDeletedEvent):
-        """Handle file deletion."""
-        if event.is_directory:
-            return
-        
-        path = event.src_path
-        
-        if not self._is_supported(path):
-            return
+    def _fire_due(self) -> None:
+        """Fire callbacks for files whose debounce period has passed."""
+        now = time.monotonic()
         
-        if not self._should_process(path, 'deleted'):
-            return
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, path = heapq.heappop(self._deadlines)
+            event_type, fire_time = self._pending[path]
+            
+            if fire_time > now:
+                # More events arrived since this deadline was pushed
+                heapq.heappush(self._deadlines, (fire_time, path))
+                continue
+            
+            del self._pending[path]
+            self._fire(path, event_type)
+    
+    def _fire_pending(self) -> None:
+        """Fire callbacks for all pending events without waiting, oldest first."""
+        if self._pending:
+            logger.debug("Firing %d pending file events before stopping", len(self._pending))
         
-        logger.info(f"File deleted: {path}")
+        pending = sorted(self._pending.items(), key=lambda item: item[1][1])
+        self._pending.clear()
+        self._deadlines.clear()
         
-        if self.on_deleted_callback:
+        for path, (event_type, _) in pending:
             try:
-                self.on_deleted_callback(path)
+                self._fire(path, event_type)
             except Exception as e:
-                logger.error(f"Error in on_deleted callback: {e}")
+                logger.error(f"Error in file event callback: {e}")
+    
+    def _fire(self, path: str, event_type: str) -> None:
+        """Invoke the callback for a debounced event."""
+        callbacks = {
+            'created': self.on_created_callback,
+            'modified': self.on_modified_callback,
+            'deleted': self.on_deleted_callback,
+        }
+        callback = callbacks[event_type]
+        
+        logger.info(f"File {event_type}: {path}")
+        
+        if callback:
+            callback(path)  # Exceptions are logged by _drain
+    
+    def _dispatch(self, event_type: str, path: str) -> None:
+        """Queue an event for a supported file (runs on the observer thread)."""
+        if self._is_supported(path):
+            self._events.put_nowait((event_type, path))
+    
+    def on_created(self, event: FileCreatedEvent):
+        """Handle file creation."""
+        if not event.is_directory:
+            self._dispatch('created', event.src_path)
+    
+    def on_modified(self, event: FileModifiedEvent):
+        """Handle file modification."""
+        if not event.is_directory:
+            self._dispatch('modified', event.src_path)
+    
+    def on_deleted(self, event: FileDeletedEvent):
+        """Handle file deletion."""
+        if not event.is_directory:
+            self._dispatch('deleted', event.src_path)
     
     def on_moved(self, event: FileMovedEvent):
         """Handle file move/rename."""
-        if event.is_directory:
-            return
-        
-        src_path = event.src_path
-        dest_path = event.dest_path
-        
-        # Treat as delete + create
-        if self._is_supported(src_path):
-            logger.info(f"File moved from: {src_path}")
-            if self.on_deleted_callback:
-                try:
-                    self.on_deleted_callback(src_path)
-                except Exception as e:
-                    logger.error(f"Error in on_deleted callback: {e}")
-        
-        if self._is_supported(dest_path):
-            logger.info(f"File moved to: {dest_path}")
-            if self.on_created_callback:
-                try:
-                    self.on_created_callback(dest_path)
-                except Exception as e:
-                    logger.error(f"Error in on_created callback: {e}")
+        if not event.is_directory:
+            # Treat as delete + create
+            self._dispatch('deleted', event.src_path)
+            self._dispatch('created', event.dest_path)
 
 
 class FileWatcher:
@@ -205,7 +281,9 @@ class FileWatcher:
         on_modified: Optional[Callable[[str], None]] = None,
         on_deleted: Optional[Callable[[str], None]] = None,
         recursive: bool = True,
-        debounce_seconds: float = 2.0
+        debounce_seconds: float = 2.0,
+        force_polling: bool = False,
+        polling_interval: float = 3.0
     ):
         """
         Initialize file watcher.
@@ -218,9 +296,13 @@ class FileWatcher:
             on_deleted: Callback for file deletion
             recursive: Whether to watch subdirectories
             debounce_seconds: Debounce time for events
+            force_polling: Poll for changes even on local disks
+            polling_interval: Seconds between polls (network shares or force_polling)
         """
         self.directory = Path(directory)
         self.recursive = recursive
+        self.force_polling = force_polling
+        self.polling_interval = polling_interval
         
         if not self.directory.exists():
             raise FileNotFoundError(f"Directory not found: {directory}")
@@ -238,7 +320,7 @@ class FileWatcher:
         )
         
         # Create observer
-        self.observer = Observer()
+        self.observer = self._create_observer()
         self.is_running = False
         
         logger.info(
@@ -246,6 +328,67 @@ class FileWatcher:
             f"(recursive: {recursive})"
         )
     
+    def _create_observer(self):
+        """
+        Create an observer suited to the watched directory.
+        
+        Native notifications (inotify, ReadDirectoryChangesW, FSEvents) miss
+        changes made on other machines to network shares, so those are
+        polled instead.
+        """
+        if self.force_polling or self._is_network_path(str(self.directory)):
+            logger.info(
+                f"Using polling observer for {self.directory} "
+                f"(interval: {self.polling_interval}s)"
+            )
+            return PollingObserver(timeout=self.polling_interval)
+        
+        return Observer()
+    
+    @staticmethod
+    def _is_network_path(path: str) -> bool:
+        """
+        Check if a path is on a network filesystem.
+        
+        Args:
+            path: Path to check
+            
+        Returns:
+            True for SMB/NFS-style mounts and remote drives; False if unknown
+        """
+        path = os.path.realpath(path)
+        
+        try:
+            if sys.platform == 'win32':
+                if path.startswith('\\\\'):
+                    return True  # UNC path
+                
+                import ctypes
+                DRIVE_REMOTE = 4
+                root = os.path.splitdrive(path)[0] + '\\'
+                return ctypes.windll.kernel32.GetDriveTypeW(root) == DRIVE_REMOTE
+            
+            if sys.platform.startswith('linux'):
+                # Filesystem type of the longest mount point containing path
+                best_mount, best_type = '', ''
+                with open('/proc/mounts', 'r', encoding='utf-8') as f:
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) < 3:
+                            continue
+                        mount = fields[1].replace('\\040', ' ')
+                        if (
+                            (path == mount or path.startswith(mount.rstrip('/') + '/'))
+                            and len(mount) > len(best_mount)
+                        ):
+                            best_mount, best_type = mount, fields[2]
+                return best_type in NETWORK_FS_TYPES
+        
+        except Exception as e:
+            logger.debug(f"Could not determine filesystem type of {path}: {e}")
+        
+        return False
+    
     def start(self):
         """Start watching the directory."""
         if self.is_running:
@@ -260,6 +403,7 @@ class FileWatcher:
             recursive=self.recursive
         )
         
+        self.event_handler.start()
         self.observer.start()
         self.is_running = True
         
@@ -275,6 +419,9 @@ class FileWatcher:
         
         self.observer.stop()
         self.observer.join(timeout=5)
+        if self.observer.is_alive():
+            logger.warning("FileWatcher observer did not stop within 5s")
+        self.event_handler.stop()
         self.is_running = False
         
         logger.info("FileWatcher stopped")
@@ -282,9 +429,8 @@ class FileWatcher:
     def restart(self):
         """Restart the watcher."""
         logger.info("Restarting FileWatcher")
-        self.stop()
-        time.sleep(0.5)  # Brief pause
-        self.observer = Observer()  # Create new observer
+        self.stop()  # Joins the observer thread, so no pause is needed
+        self.observer = self._create_observer()  # Create new observer
         self.start()
     
     def update_directory(self, new_directory: str):
@@ -309,7 +455,7 @@ class FileWatcher:
         
         # Create a new observer (can't restart old one)
         if was_running:
-            self.observer = Observer()
+            self.observer = self._create_observer()
             self.start()
     
     def update_callbacks(
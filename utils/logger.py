@@ -2,11 +2,421 @@
 Logging configuration for the application.
 """
 
+import atexit
+import codecs
+import functools
+import keyword
 import logging
+import os
+import queue
+import re
 import sys
+import threading
+import time
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Iterable, List, Optional, Set
+
+# Log directories already created by setup_logger
+_dirs_ensured: Set[str] = set()
+
+
+class CachedFormatter(logging.Formatter):
+    """
+    Formatter that reuses the rendered parts of its format string.
+    
+    For formats of the form '%(asctime)s<prefix>%(message)s' with a
+    datefmt, the timestamp is rendered once per second and the prefix once
+    per call site, instead of %-formatting the whole string for every
+    record. Other formats of plain %(field)s / %(field)d placeholders are
+    compiled into an f-string function once; anything else is handled by
+    logging.Formatter unchanged.
+    """
+    
+    # Fields the cached prefix may use; they are the cache key
+    PREFIX_FIELDS = frozenset({'name', 'levelname', 'levelno', 'module', 'lineno'})
+    MAX_PREFIXES = 4096
+    
+    _FIELD = re.compile(r'%\((\w+)\)([sd])')
+    
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None):
+        super().__init__(fmt=fmt, datefmt=datefmt)
+        
+        compiled = self._compile_format(self._fmt)
+        if compiled is not None:
+            self.formatMessage = compiled
+        
+        self._prefix_fmt: Optional[str] = None
+        head, sep, tail = self._fmt.partition('%(asctime)s')
+        # Without datefmt, asctime includes milliseconds and cannot be reused
+        if datefmt and not head and sep and tail.endswith('%(message)s'):
+            prefix_fmt = tail[:-len('%(message)s')]
+            if set(re.findall(r'%\((\w+)\)', prefix_fmt)) <= self.PREFIX_FIELDS:
+                self._prefix_fmt = prefix_fmt
+        
+        self._prefixes: dict = {}
+        self._last_sec: Optional[int] = None
+        self._last_datefmt: Optional[str] = None
+        self._asctime = ''
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Format the record time, rendering each second only once."""
+        if not datefmt:
+            return super().formatTime(record, datefmt)  # Includes milliseconds
+        
+        sec = int(record.created)
+        if sec != self._last_sec or datefmt != self._last_datefmt:
+            self._asctime = time.strftime(datefmt, self.converter(sec))
+            self._last_sec = sec
+            self._last_datefmt = datefmt
+        return self._asctime
+    
+    @classmethod
+    def _compile_format(cls, fmt: str) -> Optional[Callable[[logging.LogRecord], str]]:
+        """
+        Compile a format string into a function building the message.
+        
+        '%(asctime)s - %(message)s' becomes the equivalent of
+        lambda r: f"{r.asctime} - {r.message}", and '%(msecs)d' becomes
+        {int(r.msecs)}.
+        
+        Returns:
+            The function, or None for formats using other conversions
+            (e.g. '%(x)5s' or '%%')
+        """
+        parts = cls._FIELD.split(fmt)
+        literals, fields, conversions = parts[0::3], parts[1::3], parts[2::3]
+        
+        if any('%' in literal for literal in literals):
+            return None
+        if not all(field.isidentifier() and not keyword.iskeyword(field) for field in fields):
+            return None
+        
+        template = literals[0].replace('{', '{{').replace('}', '}}')
+        for field, conversion, literal in zip(fields, conversions, literals[1:]):
+            value = 'int(r.' + field + ')' if conversion == 'd' else 'r.' + field
+            template += '{' + value + '}' + literal.replace('{', '{{').replace('}', '}}')
+        
+        namespace = {}
+        exec(f"def format_message(r):\n    return f{template!r}\n", namespace)
+        return namespace['format_message']
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record, reusing cached timestamp and prefix."""
+        if self._prefix_fmt is None:
+            return super().format(record)
+        
+        record.message = record.getMessage()
+        
+        record.asctime = self.formatTime(record, self.datefmt)
+        
+        key = (record.name, record.module, record.lineno, record.levelno)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if len(self._prefixes) >= self.MAX_PREFIXES:
+                self._prefixes.clear()
+            prefix = self._prefixes[key] = self._prefix_fmt % record.__dict__
+        
+        s = record.asctime + prefix + record.message
+        
+        # Same exception and stack handling as logging.Formatter.format
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + self.formatStack(record.stack_info)
+        return s
+
+
+class _DeferredFlushMixin:
+    """
+    Handler mixin that flushes periodically instead of after every record.
+    
+    The stream is flushed every flush_interval seconds by a background
+    thread, and immediately for records at flush_level or above.
+    """
+    
+    def _start_flusher(self, flush_interval: float, flush_level: int) -> None:
+        """Start the background flush thread."""
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            name="LogFlusher",
+            daemon=True
+        )
+        self._flusher.start()
+    
+    def _flush_periodically(self) -> None:
+        """Background thread: flush buffered records until closed."""
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+    
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """
+        Filter and emit several records under one lock acquisition.
+        
+        Args:
+            records: Records already checked against the handler level
+        """
+        records = [record for record in records if self.filter(record)]
+        if not records:
+            return
+        
+        with self.lock:
+            self.emit_batch(records)
+    
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        """Emit several records (the handler lock is held)."""
+        for record in records:
+            self.emit(record)
+    
+    def close(self) -> None:
+        """Stop the flush thread and close the handler."""
+        self._closed.set()
+        super().close()
+
+
+class BufferedStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    """
+    StreamHandler that leaves flushing to the stream's own buffering.
+    
+    Meant for redirected output (pipe or file), where the stream is block
+    buffered and flushing every record would cost a write() per line.
+    """
+    
+    def __init__(
+        self,
+        stream=None,
+        flush_interval: float = 0.2,
+        flush_level: int = logging.WARNING
+    ):
+        """
+        Initialize the handler.
+        
+        Args:
+            stream: Output stream (default: sys.stderr)
+            flush_interval: Seconds between background flushes
+            flush_level: Records at this level or above are flushed at once
+        """
+        super().__init__(stream)
+        self._start_flusher(flush_interval, flush_level)
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a record, flushing only for records at flush_level or above."""
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        """Write several records with a single write call."""
+        try:
+            terminator = self.terminator
+            self.stream.write(''.join(self.format(record) + terminator for record in records))
+            
+            if any(record.levelno >= self.flush_level for record in records):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(records[-1])
+
+
+class BufferedRotatingFileHandler(_DeferredFlushMixin, RotatingFileHandler):
+    """
+    RotatingFileHandler that buffers writes instead of flushing every record.
+    
+    Records are written into a buffer (64 KiB by default), flushed when full,
+    every flush_interval seconds by a background thread, and immediately
+    for records at flush_level or above, so warnings and errors reach the
+    file right away.
+    
+    The file size is tracked by counting the bytes written, so checking
+    for rollover needs no tell() or stat call per record. With UTF-8 files
+    on POSIX, each record is encoded once and written to the underlying
+    binary buffer, instead of once for counting and again by the text
+    layer.
+    """
+    
+    BUFFER_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        filename: str,
+        buffer_size: int = BUFFER_SIZE,
+        flush_interval: float = 0.2,
+        flush_level: int = logging.WARNING,
+        **kwargs
+    ):
+        """
+        Initialize the handler.
+        
+        Args:
+            filename: Log file path
+            buffer_size: Write buffer size in bytes (one write() per buffer)
+            flush_interval: Seconds between background flushes
+            flush_level: Records at this level or above are flushed at once
+            **kwargs: Passed to RotatingFileHandler
+        """
+        self.buffer_size = buffer_size  # Needed by _open, called from __init__
+        self._bytes = 0  # Size of the current log file
+        self._raw = None  # Binary buffer of the stream, if records are written as bytes
+        super().__init__(filename, **kwargs)
+        self._start_flusher(flush_interval, flush_level)
+    
+    def _open(self):
+        """Open the log file with a large write buffer."""
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors
+        )
+        self._bytes = os.fstat(stream.fileno()).st_size
+        
+        # Bytes bypass the text layer's newline translation, so only where
+        # there is none
+        if codecs.lookup(stream.encoding).name == 'utf-8' and os.linesep == '\n':
+            self._raw = stream.buffer
+        else:
+            self._raw = None
+        return stream
+    
+    def _would_overflow(self, size: int) -> bool:
+        """Check if writing size more bytes should start a new file."""
+        # An empty file is written to regardless, as RotatingFileHandler does
+        return 0 < self.maxBytes <= self._bytes + size and self._bytes > 0
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Check if the record would push the file past maxBytes."""
+        msg = self.format(record) + self.terminator
+        return self._would_overflow(len(msg if msg.isascii() else msg.encode('utf-8')))
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a record, flushing only for records at flush_level or above."""
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            
+            msg = self.format(record) + self.terminator
+            if self._raw is not None:
+                data = msg.encode('utf-8', self.errors or 'strict')
+                size = len(data)
+            else:
+                # Byte length; UTF-8 sizes are close enough for other encodings
+                size = len(msg if msg.isascii() else msg.encode('utf-8'))
+            
+            if self._would_overflow(size):
+                self.doRollover()  # Reopens the file and resets _raw
+            
+            if self._raw is not None:
+                self._raw.write(data)
+            else:
+                self.stream.write(msg)
+            self._bytes += size
+            
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class LocklessQueueHandler(QueueHandler):
+    """
+    QueueHandler that does not take the handler lock.
+    
+    Handler.handle serializes emit() with an RLock, so threads logging at
+    the same time wait for each other. Here emit() only puts the record on
+    a thread-safe queue, so the lock protects nothing and is skipped.
+    """
+    
+    def handle(self, record: logging.LogRecord):
+        """Filter and enqueue a record without locking."""
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv  # Filters may return a replacement record (3.12+)
+        if rv:
+            self.emit(record)
+        return rv
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener that hands records to its handlers in batches.
+    
+    Every wake-up takes all queued records (up to MAX_BATCH) and passes
+    them to each handler at once; handlers with a handle_batch method
+    write them under a single lock acquisition, others get one handle()
+    call per record as with QueueListener.
+    """
+    
+    MAX_BATCH = 1024
+    
+    def stop(self) -> None:
+        """Stop the listener; does nothing if it is not running."""
+        if self._thread is not None:
+            super().stop()
+    
+    def _monitor(self) -> None:
+        """Listener thread: dequeue batches of records until stopped."""
+        has_task_done = hasattr(self.queue, 'task_done')
+        stopping = False
+        
+        while not stopping:
+            # Block for the first record, then take whatever else is queued
+            items = [self.dequeue(True)]
+            while len(items) < self.MAX_BATCH:
+                try:
+                    items.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            
+            if has_task_done:
+                for _ in items:
+                    self.queue.task_done()
+            
+            records = []
+            for item in items:
+                if item is self._sentinel:
+                    stopping = True
+                    break
+                records.append(self.prepare(item))
+            
+            if records:
+                self.handle_batch(records)
+    
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """Pass a batch of records to every handler."""
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                batch = [record for record in records if record.levelno >= handler.level]
+            else:
+                batch = records
+            
+            if not batch:
+                continue
+            
+            if hasattr(handler, 'handle_batch'):
+                handler.handle_batch(batch)
+            else:
+                for record in batch:
+                    handler.handle(record)
 
 
 def setup_logger(
@@ -16,11 +426,16 @@ def setup_logger(
     log_dir: str = "./logs",
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
-    console_output: bool = True
+    console_output: bool = True,
+    buffer_size: int = BufferedRotatingFileHandler.BUFFER_SIZE,
+    caller_info: bool = False
 ) -> logging.Logger:
     """
     Setup application logger with file and console handlers.
     
+    The handlers run on a QueueListener thread; logging calls only put the
+    record on a queue, so callers never wait for console or disk I/O.
+    
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -29,6 +444,8 @@ def setup_logger(
         max_bytes: Maximum size of log file before rotation
         backup_count: Number of backup files to keep
         console_output: Whether to output to console
+        buffer_size: Log file write buffer size in bytes
+        caller_info: Include module:lineno in the log file
         
     Returns:
         Configured logger instance
@@ -37,55 +454,124 @@ def setup_logger(
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
+    # Records are handled here only, never again by root handlers
+    logger.propagate = False
+    
+    _attach_handlers(
+        name, level, log_file, log_dir, max_bytes, backup_count,
+        console_output, buffer_size, caller_info
+    )
+    
+    # Console output follows the latest level; the file gets everything
+    listener = getattr(logger, '_listener', None)
+    if listener is not None:
+        for handler in listener.handlers:
+            if not isinstance(handler, logging.FileHandler):
+                handler.setLevel(level)
+    
+    return logger
+
+
+@functools.lru_cache(maxsize=16)
+def _attach_handlers(
+    name: str,
+    level: int,
+    log_file: Optional[str],
+    log_dir: str,
+    max_bytes: int,
+    backup_count: int,
+    console_output: bool,
+    buffer_size: int,
+    caller_info: bool
+) -> None:
+    """
+    Add the queue handler and start the listener of a logger (see setup_logger).
+    
+    Cached per argument combination, so repeated setup_logger calls with
+    the same arguments skip the handler setup entirely.
+    """
+    # None of the formats use thread or process names; skip collecting them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    logger = logging.getLogger(name)
+    
     # Avoid adding handlers multiple times
     if logger.handlers:
-        return logger
+        return
     
     # Create formatters
-    detailed_formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s',
+    if caller_info:
+        detailed_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'
+    else:
+        detailed_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    detailed_formatter = CachedFormatter(
+        fmt=detailed_fmt,
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    simple_formatter = logging.Formatter(
+    simple_formatter = CachedFormatter(
         fmt='%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%H:%M:%S'
     )
     
+    handlers = []
+    
     # Console handler
     if console_output:
-        console_handler = logging.StreamHandler(sys.stdout)
+        if sys.stdout.isatty():
+            console_handler = logging.StreamHandler(sys.stdout)
+        else:
+            # Redirected: let records accumulate in stdout's block buffer
+            console_handler = BufferedStreamHandler(sys.stdout)
         console_handler.setLevel(level)
         console_handler.setFormatter(simple_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     # File handler (with rotation)
     if log_file is None:
         log_file = f"{name}.log"
     
-    log_path = Path(log_dir)
-    log_path.mkdir(parents=True, exist_ok=True)
+    if log_dir not in _dirs_ensured:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        _dirs_ensured.add(log_dir)
     
-    file_path = log_path / log_file
+    file_path = os.path.join(log_dir, log_file)
     
-    file_handler = RotatingFileHandler(
-        filename=str(file_path),
+    file_handler = BufferedRotatingFileHandler(
+        filename=file_path,
         maxBytes=max_bytes,
         backupCount=backup_count,
-        encoding='utf-8'
+        encoding='utf-8',
+        buffer_size=buffer_size
     )
     file_handler.setLevel(logging.DEBUG)  # Log everything to file
     file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
     
-    # Log initial message
-    logger.info("=" * 80)
-    logger.info(f"Logger '{name}' initialized")
-    logger.info(f"Log level: {logging.getLevelName(level)}")
-    logger.info(f"Log file: {file_path}")
-    logger.info("=" * 80)
+    # Handlers run on the listener thread
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(LocklessQueueHandler(log_queue))
     
-    return logger
+    listener = BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger._listener = listener
+    
+    # Registered after logging's own shutdown hook, so it runs first and
+    # the queue is drained before the handlers are closed
+    atexit.register(listener.stop)
+    
+    # Log initial message (one record)
+    banner = "\n".join((
+        "=" * 80,
+        f"Logger '{name}' initialized",
+        f"Log level: {logging.getLevelName(level)}",
+        f"Log file: {file_path}",
+        "=" * 80,
+    ))
+    logger.info("%s", banner)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -124,29 +610,50 @@ class LoggerContext:
         with LoggerContext(logging.DEBUG):
             # Code that needs debug logging
             pass
+        
+        with LoggerContext(logging.WARNING, global_disable=True):
+            # Code whose INFO and DEBUG output is dropped everywhere
+            pass
     """
     
-    def __init__(self, level: int, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        level: int,
+        logger: Optional[logging.Logger] = None,
+        global_disable: bool = False
+    ):
         """
         Initialize context.
         
         Args:
             level: Temporary log level
             logger: Specific logger (default: root logger)
+            global_disable: Drop records below level for all loggers with
+                logging.disable, a single check per call, instead of
+                setting the level of one logger. Can only silence, not
+                enable levels below a logger's own level.
         """
         self.level = level
         self.logger = logger or logging.getLogger()
+        self.global_disable = global_disable
         self.original_level = None
     
     def __enter__(self):
         """Enter context."""
-        self.original_level = self.logger.level
-        self.logger.setLevel(self.level)
+        if self.global_disable:
+            self.original_level = logging.root.manager.disable
+            logging.disable(self.level - 1)
+        else:
+            self.original_level = self.logger.level
+            self.logger.setLevel(self.level)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Exit context."""
-        self.logger.setLevel(self.original_level)
+        if self.global_disable:
+            logging.disable(self.original_level)
+        else:
+            self.logger.setLevel(self.original_level)
 
 
 def log_exception(logger: logging.Logger, message: str = "Exception occurred"):
@@ -163,17 +670,19 @@ def log_exception(logger: logging.Logger, message: str = "Exception occurred"):
             pass
     """
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                logger.exception(f"{message}: {e}")
+                # Lazy arguments: nothing is formatted if ERROR is disabled
+                logger.exception("%s: %s", message, e)
                 raise
         return wrapper
     return decorator
 
 
-def configure_third_party_loggers(level: int = logging.WARNING):
+def configure_third_party_loggers(level: int = logging.WARNING, disable: Iterable[str] = ()):
     """
     Configure logging levels for third-party libraries.
     
@@ -181,6 +690,9 @@ def configure_third_party_loggers(level: int = logging.WARNING):
     
     Args:
         level: Logging level for third-party libraries
+        disable: Libraries to silence completely. Their loggers, and child
+            loggers that already exist, are disabled and stop propagating,
+            so logging calls return before a record is created.
     """
     third_party = [
         'urllib3',
@@ -195,6 +707,17 @@ def configure_third_party_loggers(level: int = logging.WARNING):
     
     for lib in third_party:
         logging.getLogger(lib).setLevel(level)
+    
+    disable = set(disable)
+    if not disable:
+        return
+    
+    # disabled is not inherited, so walk the child loggers created so far
+    for logger_name in list(logging.root.manager.loggerDict):
+        if logger_name.split('.', 1)[0] in disable:
+            lib_logger = logging.getLogger(logger_name)
+            lib_logger.disabled = True
+            lib_logger.propagate = False
 
 
 # Example usage and testing